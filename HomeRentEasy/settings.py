@@ -52,15 +52,18 @@ INSTALLED_APPS = [
     'applications.rent.apps.RentConfig',
     'applications.bookings.apps.BookingsConfig',
     'applications.reviews.apps.ReviewsConfig',
+    'applications.search.apps.SearchConfig',
+    'applications.notifications.apps.NotificationsConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Сессии, CSRF, request.user и сообщения нужны только админке и swagger, для API они пропускаются
+    'applications.middleware.api.WebSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'applications.middleware.api.WebCsrfViewMiddleware',
+    'applications.middleware.api.WebAuthenticationMiddleware',
+    'applications.middleware.api.WebMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 
     'applications.middleware.jwt_helper.JWTAuthenticationMiddleware',
@@ -68,11 +71,14 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'HomeRentEasy.urls'
 
+# Запросы с этим префиксом идут по облегченному стеку middleware (applications.middleware.api)
+API_PATH_PREFIX = '/api/'
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 # EMAIL_HOST = 'maildev'
-EMAIL_HOST = 'localhost'
-EMAIL_PORT = 1025
+EMAIL_HOST = env('EMAIL_HOST', default='localhost')
+EMAIL_PORT = env.int('EMAIL_PORT', default=1025)
 # EMAIL_HOST_USER = ''
 # EMAIL_HOST_PASSWORD = ''
 # EMAIL_USE_TLS = False
@@ -124,6 +130,35 @@ else:
         }
     }
 
+# Кэш общий для всех воркеров и фоновых команд (в docker-compose — Redis): через него
+# расходятся поколения кэша списка объявлений. По умолчанию — кэш в памяти одного процесса
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://home-rent-easy'),
+}
+
+# Время жизни закэшированных страниц списка объявлений (секунды)
+RENT_LIST_CACHE_TIMEOUT = env.int('RENT_LIST_CACHE_TIMEOUT', default=60)
+
+# Время жизни закэшированного календаря занятости объявления (секунды)
+RENT_AVAILABILITY_CACHE_TIMEOUT = env.int('RENT_AVAILABILITY_CACHE_TIMEOUT', default=300)
+
+# Просмотры объявлений копятся в памяти и пишутся в БД раз в N секунд
+RENT_VIEWS_FLUSH_INTERVAL = env.int('RENT_VIEWS_FLUSH_INTERVAL', default=30)
+# Окно (секунды), в котором повторный просмотр того же посетителя не считается; 0 — не дедуплицировать
+RENT_VIEWS_DEDUP_WINDOW = env.int('RENT_VIEWS_DEDUP_WINDOW', default=0)
+
+# Через сколько дней после даты заезда неподтвержденная заявка считается истекшей
+BOOKING_PENDING_GRACE_DAYS = env.int('BOOKING_PENDING_GRACE_DAYS', default=0)
+
+# Outbox писем: размер пачки, период опроса воркера (секунды), число попыток и базовая задержка повтора (секунды)
+OUTBOX_BATCH_SIZE = env.int('OUTBOX_BATCH_SIZE', default=100)
+OUTBOX_POLL_INTERVAL = env.int('OUTBOX_POLL_INTERVAL', default=5)
+OUTBOX_MAX_ATTEMPTS = env.int('OUTBOX_MAX_ATTEMPTS', default=5)
+OUTBOX_RETRY_BACKOFF = env.int('OUTBOX_RETRY_BACKOFF', default=60)
+
+# Окно сводки отзывов (часы): владелец с review_digest получает не больше одного письма за окно
+REVIEW_DIGEST_WINDOW_HOURS = env.int('REVIEW_DIGEST_WINDOW_HOURS', default=24)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -156,20 +191,33 @@ SWAGGER_SETTINGS = {
 
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'applications.pagination.CustomCursorPagination',
+    # Сессионная аутентификация подключена только у swagger (HomeRentEasy/urls.py).
+    # JWT первым классом: без токена API отвечает 401 с WWW-Authenticate, а не 403
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'applications.users.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated'
-    ]
+    ],
+    # Попытки входа и регистрации: корзина на N попыток, пополняется по N за период
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': env.str('LOGIN_IP_THROTTLE_RATE', default='20/min'),
+        'login_email': env.str('LOGIN_EMAIL_THROTTLE_RATE', default='5/min'),
+        'register_ip': env.str('REGISTER_IP_THROTTLE_RATE', default='5/min'),
+        'register_email': env.str('REGISTER_EMAIL_THROTTLE_RATE', default='3/min'),
+    },
+    # Сколько прокси (nginx) стоит перед приложением: IP клиента берется из X-Forwarded-For.
+    # По умолчанию 0 — заголовок не учитывается, иначе клиент обходил бы ограничение по IP,
+    # подставляя свой X-Forwarded-For; в docker-compose перед приложением nginx, там NUM_PROXIES=1
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=0),
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=15),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
-    'ROTATE_REFRESH_TOKENS': False,
-    'BLACKLIST_AFTER_ROTATION': True,
+    'ROTATE_REFRESH_TOKENS': True,
+    # Отзыв токенов — applications.users.revocation, приложение token_blacklist не используется
+    'BLACKLIST_AFTER_ROTATION': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -177,6 +225,26 @@ SIMPLE_JWT = {
     #     # 'TOKEN_OBTAIN_SERIALIZER': 'свой путь к новому сериализатору',
 }
 
+# Для небезопасных методов (POST/PUT/PATCH/DELETE) пользователь грузится из БД, а не из claims токена
+JWT_DB_USER_FOR_WRITES = env.bool('JWT_DB_USER_FOR_WRITES', default=True)
+
+# Кэш пользователей в памяти воркера: максимум записей и время жизни записи (секунды).
+# Изменения пользователя другие воркеры видят с задержкой до USER_CACHE_TTL;
+# блокировка доходит до них сразу только при общем кэше (CACHE_URL)
+USER_CACHE_SIZE = env.int('USER_CACHE_SIZE', default=1024)
+USER_CACHE_TTL = env.int('USER_CACHE_TTL', default=30)
+
+# Фильтр отозванных refresh-токенов в памяти воркера: на сколько записей рассчитан,
+# доля ложноположительных ответов и как часто подгружаются новые отзывы (секунды).
+# При ротации отзыв виден сразу; без нее и без общего кэша (CACHE_URL) другие воркеры
+# принимают отозванный токен до REVOKED_TOKENS_SYNC_INTERVAL секунд
+REVOKED_TOKENS_FILTER_CAPACITY = env.int('REVOKED_TOKENS_FILTER_CAPACITY', default=100_000)
+REVOKED_TOKENS_FILTER_ERROR_RATE = env.float('REVOKED_TOKENS_FILTER_ERROR_RATE', default=0.01)
+REVOKED_TOKENS_SYNC_INTERVAL = env.int('REVOKED_TOKENS_SYNC_INTERVAL', default=30)
+
+# Сколько секунд после ротации старый refresh-токен еще принимается от параллельных запросов
+REFRESH_TOKEN_REUSE_GRACE = env.int('REFRESH_TOKEN_REUSE_GRACE', default=10)
+
 LOG_DIR = Path(BASE_DIR) / "logs"
 LOG_DIR.mkdir(exist_ok=True)
 
@@ -19,6 +19,9 @@ from django.urls import path, include
 from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
+from rest_framework.authentication import SessionAuthentication
+
+from applications.users.authentication import ClaimsJWTAuthentication
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -31,6 +34,8 @@ schema_view = get_schema_view(
     ),
     public=False,
     permission_classes=[permissions.IsAdminUser],
+    # Документацию открывают из браузера после входа в админку
+    authentication_classes=[SessionAuthentication, ClaimsJWTAuthentication],
 )
 
 urlpatterns = [
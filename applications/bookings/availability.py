@@ -0,0 +1,100 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from applications.bookings.choices.waiting_status import WaitingStatus
+from applications.bookings.models import Booking
+
+ONE_DAY = timedelta(days=1)
+
+
+def _version_key(rent_id):
+    return f'rent_availability:{rent_id}:version'
+
+
+def availability_version(rent_id) -> int:
+    key = _version_key(rent_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(rent_id):
+    try:
+        cache.incr(_version_key(rent_id))
+    except ValueError:
+        availability_version(rent_id)
+
+
+def invalidate_availability(rent_ids):
+    for rent_id in set(rent_ids):
+        transaction.on_commit(lambda rent_id=rent_id: _bump_version(rent_id))
+
+
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def free_intervals(date_from, date_to, busy):
+    free = []
+    cursor = date_from
+    for start, end in busy:
+        if start > cursor:
+            free.append([cursor, start - ONE_DAY])
+        cursor = max(cursor, end + ONE_DAY)
+    if cursor <= date_to:
+        free.append([cursor, date_to])
+    return free
+
+
+def _serialize(intervals):
+    return [{'start': start.isoformat(), 'end': end.isoformat()} for start, end in intervals]
+
+
+def compute_availability(rent_id, date_from, date_to) -> dict:
+    # Выборка идет по booking_date_check_idx (rent, start_date, end_date)
+    bookings = (
+        Booking.objects
+        .filter(rent_id=rent_id,
+                start_date__lte=date_to,
+                end_date__gte=date_from,
+                status__in=[WaitingStatus.CONFIRMED.name, WaitingStatus.PENDING.name])
+        .order_by()
+        .values_list('start_date', 'end_date', 'status')
+    )
+
+    intervals = {WaitingStatus.CONFIRMED.name: [], WaitingStatus.PENDING.name: []}
+    for start, end, status in bookings:
+        intervals[status].append((max(start, date_from), min(end, date_to)))
+
+    confirmed = merge_intervals(intervals[WaitingStatus.CONFIRMED.name])
+    pending = merge_intervals(intervals[WaitingStatus.PENDING.name])
+
+    return {
+        'rent': rent_id,
+        'from': date_from.isoformat(),
+        'to': date_to.isoformat(),
+        'confirmed': _serialize(confirmed),
+        'pending': _serialize(pending),
+        'free': _serialize(free_intervals(date_from, date_to, confirmed)),
+    }
+
+
+def get_availability(rent_id, date_from, date_to) -> dict:
+    key = f'rent_availability:{rent_id}:{availability_version(rent_id)}:{date_from}:{date_to}'
+    data = cache.get(key)
+    if data is None:
+        data = compute_availability(rent_id, date_from, date_to)
+        cache.set(key, data, settings.RENT_AVAILABILITY_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,74 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db.models import Count, Max, Q
+
+from applications.bookings.choices.waiting_status import WaitingStatus
+from applications.bookings.models import Booking
+
+PRODID = '-//HomeRentEasy//Booking calendar//RU'
+
+
+def calendar_state(request, rent_id) -> dict:
+    """
+    Время последнего изменения броней объявления и число подтвержденных.
+    Считается одним запросом и запоминается на запросе: нужно и для ETag, и для Last-Modified.
+    """
+    state = getattr(request, '_calendar_state', None)
+    if state is None:
+        state = Booking.objects.filter(rent_id=rent_id).order_by().aggregate(
+            updated_at=Max('updated_at'),
+            confirmed=Count('id', filter=Q(status=WaitingStatus.CONFIRMED.name)),
+        )
+        request._calendar_state = state
+    return state
+
+
+def calendar_etag(request, rent_id) -> str:
+    state = calendar_state(request, rent_id)
+    updated_at = state['updated_at']
+    stamp = int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+    return f'"{rent_id}-{state["confirmed"]}-{stamp}"'
+
+
+def calendar_last_modified(request, rent_id):
+    return calendar_state(request, rent_id)['updated_at']
+
+
+def _format_date(value):
+    return value.strftime('%Y%m%d')
+
+
+def _format_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def render_calendar(rent_id) -> str:
+    bookings = (
+        Booking.objects
+        .filter(rent_id=rent_id)
+        .confirmed()
+        .order_by('start_date')
+        .values_list('id', 'start_date', 'end_date', 'updated_at')
+    )
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:HomeRentEasy #{rent_id}',
+    ]
+    for booking_id, start_date, end_date, updated_at in bookings:
+        # end_date — последний день брони, а DTEND в iCalendar в событие не входит
+        lines += [
+            'BEGIN:VEVENT',
+            f'UID:booking-{booking_id}@homerenteasy',
+            f'DTSTAMP:{_format_datetime(updated_at)}',
+            f'DTSTART;VALUE=DATE:{_format_date(start_date)}',
+            f'DTEND;VALUE=DATE:{_format_date(end_date + timedelta(days=1))}',
+            'SUMMARY:Забронировано',
+            'TRANSP:OPAQUE',
+            'END:VEVENT',
+        ]
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(lines) + '\r\n'
@@ -6,6 +6,7 @@ class WaitingStatus(str, Enum):
     CONFIRMED = 'Подтверждено'
     CANCELLED = 'Отменено'
     DECLINED = 'Отклонено'
+    EXPIRED = 'Истекло'
 
     @classmethod
     def choices(cls):
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from applications.bookings.services import expire_pending_bookings
+
+
+class Command(BaseCommand):
+    help = 'Переводит просроченные заявки в ожидании в статус EXPIRED (запускать по расписанию)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-days', type=int, default=settings.BOOKING_PENDING_GRACE_DAYS)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        expired = expire_pending_bookings(
+            grace_days=options['grace_days'],
+            chunk_size=options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Истекших заявок: {expired}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from applications.bookings.occupancy import rebuild_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает дневные срезы занятости и выручки по подтвержденным броням'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_occupancy(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Подтвержденных броней: {rebuilt}'))
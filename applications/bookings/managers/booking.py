@@ -0,0 +1,11 @@
+from django.db import models
+
+from applications.bookings.choices.waiting_status import WaitingStatus
+
+
+class BookingQuerySet(models.QuerySet):
+    def overlapping(self, start_date, end_date):
+        return self.filter(start_date__lte=end_date, end_date__gte=start_date)
+
+    def confirmed(self):
+        return self.filter(status=WaitingStatus.CONFIRMED.name)
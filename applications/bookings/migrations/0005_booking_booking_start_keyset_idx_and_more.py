@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_alter_booking_end_date_alter_booking_start_date_and_more'),
+        ('rent', '0012_rentlisting_listing_rating_keyset_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['start_date', 'id'], name='booking_start_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['end_date', 'id'], name='booking_end_keyset_idx'),
+        ),
+        # Одиночные индексы повторяют составные: (start_date, id), (end_date, id) и (rent, start_date, end_date)
+        migrations.AlterField(
+            model_name='booking',
+            name='start_date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='end_date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='rent',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='rent.rent'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0005_booking_booking_start_keyset_idx_and_more'),
+        ('rent', '0013_address_geohash_address_latitude_address_longitude_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'end_date', 'start_date', 'rent'], name='booking_availability_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0006_booking_booking_availability_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='booking',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'В ожидании'), ('CONFIRMED', 'Подтверждено'), ('CANCELLED', 'Отменено'), ('DECLINED', 'Отклонено'), ('EXPIRED', 'Истекло')], db_index=True, default='PENDING', max_length=10),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_rent_owner(apps, schema_editor):
+    Booking = apps.get_model('bookings', 'Booking')
+    Rent = apps.get_model('rent', 'Rent')
+
+    Booking.objects.update(
+        rent_owner=Subquery(Rent.objects.filter(pk=OuterRef('rent_id')).values('owner_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0007_booking_status_expired'),
+        ('rent', '0013_address_geohash_address_latitude_address_longitude_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='rent_owner',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='owned_bookings', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(fill_rent_owner, migrations.RunPython.noop),
+    ]
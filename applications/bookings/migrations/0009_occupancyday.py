@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0008_booking_rent_owner'),
+        ('rent', '0013_address_geohash_address_latitude_address_longitude_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy_days', to='bookings.booking')),
+                ('rent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy_days', to='rent.rent')),
+                ('rent_owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occupancy_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'booking_occupancy_day',
+                'indexes': [models.Index(fields=['rent_owner', 'day', 'rent'], name='occupancy_owner_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('rent', 'day'), name='unique_occupancy_rent_day')],
+            },
+        ),
+    ]
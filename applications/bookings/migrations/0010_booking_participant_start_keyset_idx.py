@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 14:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0009_occupancyday'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['lessee', 'start_date', 'id'], name='booking_lessee_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['rent_owner', 'start_date', 'id'], name='booking_owner_start_idx'),
+        ),
+        # Одиночные индексы повторяют booking_lessee_start_idx и booking_status_date_idx
+        migrations.AlterField(
+            model_name='booking',
+            name='lessee',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'role': 'LESSEE'}, on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='booking',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'В ожидании'), ('CONFIRMED', 'Подтверждено'), ('CANCELLED', 'Отменено'), ('DECLINED', 'Отклонено'), ('EXPIRED', 'Истекло')], default='PENDING', max_length=10),
+        ),
+    ]
@@ -1 +1,2 @@
-from applications.bookings.models.booking import Booking
\ No newline at end of file
+from applications.bookings.models.booking import Booking
+from applications.bookings.models.occupancy import OccupancyDay
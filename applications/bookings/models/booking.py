@@ -4,35 +4,52 @@ from django.utils import timezone
 from django.db import models
 
 from applications.bookings.choices.waiting_status import WaitingStatus
+from applications.bookings.managers.booking import BookingQuerySet
+from applications.dirty_fields import DirtyFieldsMixin
 from applications.rent.models.rent import Rent
 from applications.users.models import User
 
 
-class Booking(models.Model):
+class Booking(DirtyFieldsMixin, models.Model):
     lessee = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='bookings',
         limit_choices_to={'role': 'LESSEE'},
-        db_index=True
+        # Индекс — booking_lessee_start_idx, он начинается с lessee
+        db_index=False
     )
     rent = models.ForeignKey(
         Rent,
         on_delete=models.CASCADE,
         related_name='bookings',
-        db_index=True
+        # Индекс — booking_date_check_idx
+        db_index=False
     )
-    start_date = models.DateField(db_index=True)
-    end_date = models.DateField(db_index=True)
+    # Копия rent.owner (как и он, может быть пустой): список броней пользователя читается по индексам без JOIN
+    rent_owner = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='owned_bookings',
+        null=True,
+        blank=True,
+        editable=False,
+        # Индекс — booking_owner_start_idx
+        db_index=False
+    )
+    # Отдельных индексов у дат и статуса нет: их покрывают составные индексы из Meta
+    start_date = models.DateField()
+    end_date = models.DateField()
     status = models.CharField(
         max_length=10,
         choices=WaitingStatus.choices(),
-        default=WaitingStatus.PENDING.name,
-        db_index=True
+        default=WaitingStatus.PENDING.name
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
         db_table = 'booking'
         ordering = ['-created_at']
@@ -49,8 +66,19 @@ class Booking(models.Model):
         indexes = [
             models.Index(fields=['rent', 'start_date', 'end_date'], name='booking_date_check_idx'),
             models.Index(fields=['status', 'start_date'], name='booking_status_date_idx'),
+            models.Index(fields=['start_date', 'id'], name='booking_start_keyset_idx'),
+            models.Index(fields=['end_date', 'id'], name='booking_end_keyset_idx'),
+            models.Index(fields=['status', 'end_date', 'start_date', 'rent'], name='booking_availability_idx'),
+            # Сортировка списка по дате заезда: выборка участника и курсор (start_date, id) по одному индексу
+            models.Index(fields=['lessee', 'start_date', 'id'], name='booking_lessee_start_idx'),
+            models.Index(fields=['rent_owner', 'start_date', 'id'], name='booking_owner_start_idx'),
         ]
 
+    def save(self, *args, **kwargs):
+        if self.rent_owner_id is None or self.has_changed('rent'):
+            self.rent_owner_id = self.rent.owner_id
+        super().save(*args, **kwargs)
+
     def can_cancel(self):
         return (self.status == WaitingStatus.CONFIRMED.name and
                 timezone.now().date() < self.start_date - timedelta(days=2))
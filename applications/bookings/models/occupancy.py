@@ -0,0 +1,41 @@
+from django.db import models
+
+from applications.bookings.models.booking import Booking
+from applications.rent.models.rent import Rent
+from applications.users.models import User
+
+
+class OccupancyDay(models.Model):
+    """Одна подтвержденная ночь объявления: дневной срез для статистики владельца."""
+    rent = models.ForeignKey(
+        Rent,
+        on_delete=models.CASCADE,
+        related_name='occupancy_days'
+    )
+    rent_owner = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        related_name='occupancy_days',
+        null=True,
+        blank=True
+    )
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.CASCADE,
+        related_name='occupancy_days'
+    )
+    day = models.DateField()
+    # Цена ночи на момент подтверждения
+    revenue = models.DecimalField(max_digits=8, decimal_places=2)
+
+    class Meta:
+        db_table = 'booking_occupancy_day'
+        constraints = [
+            models.UniqueConstraint(fields=['rent', 'day'], name='unique_occupancy_rent_day'),
+        ]
+        indexes = [
+            models.Index(fields=['rent_owner', 'day', 'rent'], name='occupancy_owner_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.rent_id} - {self.day}'
@@ -0,0 +1,60 @@
+from django.core.mail import EmailMultiAlternatives
+from django.template.loader import render_to_string
+
+from applications.bookings.choices.waiting_status import WaitingStatus
+from applications.notifications.outbox import enqueue_many
+
+SENDER = "HomeRentEasy@net.net"
+
+STATUS_SUBJECTS = {
+    WaitingStatus.PENDING.name: "Новое бронирование создано",
+    WaitingStatus.CONFIRMED.name: "Бронирование подтверждено",
+    WaitingStatus.DECLINED.name: "Бронирование отклонено",
+    WaitingStatus.CANCELLED.name: "Бронирование отменено",
+    WaitingStatus.EXPIRED.name: "Срок заявки на бронирование истек",
+}
+
+
+def build_status_message(booking, created=False) -> EmailMultiAlternatives:
+    subject = STATUS_SUBJECTS.get(booking.status, "Статус бронирования изменен")
+
+    if created:
+        recipient = booking.rent.owner.email
+        recipient_name = booking.rent.owner.first_name
+        text_status = "Статус бронирования на Ваше объявление изменился на:"
+    else:
+        recipient = booking.lessee.email
+        recipient_name = booking.lessee.first_name
+        text_status = "Статус Вашего бронирования изменился на:"
+
+    context = {
+        "booking": booking,
+        "recipient_name": recipient_name,
+        "text_status": text_status,
+    }
+
+    text_content = render_to_string(
+        template_name='booking_status_changed.txt',
+        context=context
+    )
+
+    html_content = render_to_string(
+        template_name='booking_status_changed.html',
+        context=context
+    )
+
+    msg = EmailMultiAlternatives(
+        subject=subject,
+        body=text_content,
+        from_email=SENDER,
+        to=[recipient],
+        headers={'List-Unsubscribe': '<mailto:unsub@example.com>'}
+    )
+
+    msg.attach_alternative(html_content, 'text/html')
+    return msg
+
+
+def enqueue_status_messages(bookings):
+    # Письма пишутся в outbox в той же транзакции, отправляет их воркер send_outbox
+    enqueue_many([build_status_message(booking) for booking in bookings])
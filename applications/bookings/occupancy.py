@@ -0,0 +1,134 @@
+import calendar
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+from applications.bookings.models import Booking, OccupancyDay
+
+logger = logging.getLogger(__name__)
+
+
+def _nights(booking):
+    # Ночи брони: с даты заезда до даты выезда, не включая ее
+    day = booking.start_date
+    while day < booking.end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+def occupancy_rows(booking, price):
+    return [
+        OccupancyDay(
+            rent_id=booking.rent_id,
+            rent_owner_id=booking.rent_owner_id,
+            booking_id=booking.pk,
+            day=day,
+            revenue=price
+        )
+        for day in _nights(booking)
+    ]
+
+
+def record_occupancy(bookings):
+    """
+    Добавляет ночи подтвержденных броней. Повторный вызов для той же брони ничего не меняет.
+    Ночь, уже занятая другой бронью, не записывается и уходит в лог ошибок:
+    подтвержденные брони не должны пересекаться, такие случаи разбираются вручную.
+    """
+    rows = []
+    for booking in bookings:
+        rows.extend(occupancy_rows(booking, booking.rent.price))
+    if not rows:
+        return
+
+    taken = dict(
+        ((rent_id, day), booking_id)
+        for rent_id, day, booking_id in (
+            OccupancyDay.objects
+            .filter(rent_id__in={row.rent_id for row in rows},
+                    day__gte=min(row.day for row in rows),
+                    day__lte=max(row.day for row in rows))
+            .exclude(booking_id__in={row.booking_id for row in rows})
+            .values_list('rent_id', 'day', 'booking_id')
+        )
+    )
+
+    accepted = []
+    for row in rows:
+        booking_id = taken.setdefault((row.rent_id, row.day), row.booking_id)
+        if booking_id != row.booking_id:
+            logger.error('Ночь %s объявления #%s уже занята бронью #%s, бронь #%s в статистику не попала',
+                         row.day, row.rent_id, booking_id, row.booking_id)
+        else:
+            accepted.append(row)
+
+    # Конфликт здесь — только повторная запись той же брони
+    OccupancyDay.objects.bulk_create(accepted, ignore_conflicts=True)
+
+
+def clear_occupancy(bookings):
+    OccupancyDay.objects.filter(booking_id__in=[booking.pk for booking in bookings]).delete()
+
+
+def rebuild_occupancy(chunk_size=500) -> int:
+    """
+    Перестраивает срезы по подтвержденным броням. Каждая порция коммитится отдельно,
+    чтобы не держать блокировки всю перестройку; пока она идет, статистика неполная.
+    """
+    confirmed = (
+        Booking.objects
+        .confirmed()
+        .select_related('rent')
+        .only('id', 'rent_id', 'rent_owner_id', 'start_date', 'end_date', 'rent__price')
+        .order_by('pk')
+    )
+
+    OccupancyDay.objects.all().delete()
+
+    last_pk = 0
+    rebuilt = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(confirmed.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            record_occupancy(chunk)
+        rebuilt += len(chunk)
+        last_pk = chunk[-1].pk
+
+    return rebuilt
+
+
+def monthly_stats(owner, month_from, month_to, rent_id=None) -> list[dict]:
+    """
+    Занятость и выручка по объявлениям владельца помесячно.
+    Читает только дневные срезы по индексу (rent_owner, day, rent).
+    """
+    last_day = month_to.replace(day=calendar.monthrange(month_to.year, month_to.month)[1])
+    rows = OccupancyDay.objects.filter(rent_owner=owner, day__gte=month_from, day__lte=last_day)
+    if rent_id is not None:
+        rows = rows.filter(rent_id=rent_id)
+
+    rows = (
+        rows
+        .annotate(month=TruncMonth('day'))
+        .values('rent_id', 'month')
+        .annotate(nights=Count('id'), revenue=Sum('revenue'))
+        .order_by('rent_id', 'month')
+    )
+
+    stats = []
+    for row in rows:
+        month = row['month']
+        days_in_month = calendar.monthrange(month.year, month.month)[1]
+        stats.append({
+            'rent': row['rent_id'],
+            'month': month.strftime('%Y-%m'),
+            'nights': row['nights'],
+            'occupancy': round(row['nights'] / days_in_month, 3),
+            'revenue': row['revenue'],
+        })
+    return stats
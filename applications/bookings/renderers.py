@@ -0,0 +1,13 @@
+from rest_framework.renderers import BaseRenderer
+
+
+class ICalendarRenderer(BaseRenderer):
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Календарь отдается готовым текстом; сюда попадают только ошибки
+        if isinstance(data, dict) and 'detail' in data:
+            data = data['detail']
+        return str(data).encode(self.charset)
@@ -5,6 +5,7 @@ from rest_framework import serializers
 
 from applications.bookings.choices.waiting_status import WaitingStatus
 from applications.bookings.models import Booking
+from applications.rent.models.rent import Rent
 
 
 class BookingListSerializer(serializers.ModelSerializer):
@@ -13,10 +14,13 @@ class BookingListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Booking
-        fields = '__all__'
+        exclude = ['rent_owner']
 
 
 class BookingCreateSerializer(serializers.ModelSerializer):
+    # Владелец нужен письму о новой брони: грузим его сразу
+    rent = serializers.PrimaryKeyRelatedField(queryset=Rent.objects.select_related('owner'))
+
     class Meta:
         model = Booking
         fields = [
@@ -60,3 +64,18 @@ class BookingCreateSerializer(serializers.ModelSerializer):
         #     })
 
         return attrs
+
+
+class BookingBulkStatusSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=100
+    )
+    status = serializers.ChoiceField(choices=[
+        WaitingStatus.CONFIRMED.name,
+        WaitingStatus.DECLINED.name,
+    ])
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
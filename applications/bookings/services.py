@@ -0,0 +1,263 @@
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q, F, Case, When, Value, IntegerField, Min, Max
+from django.utils import timezone
+from rest_framework.exceptions import PermissionDenied
+
+from applications.bookings.availability import invalidate_availability
+from applications.bookings.choices.waiting_status import WaitingStatus
+from applications.bookings.models import Booking
+from applications.bookings.notifications import enqueue_status_messages
+from applications.bookings.occupancy import record_occupancy
+from applications.rent.models.rent import Rent
+
+
+def lock_rent(rent_id):
+    lock_rents([rent_id])
+
+
+def lock_rents(rent_ids):
+    # Сериализует изменения броней объявлений до конца транзакции.
+    # В SQLite нет SELECT ... FOR UPDATE, пустой UPDATE сразу берет блокировку на запись.
+    rent_ids = sorted(set(rent_ids))
+    if connection.features.has_select_for_update:
+        list(Rent.objects.select_for_update().filter(pk__in=rent_ids).order_by('pk').values_list('pk', flat=True))
+    else:
+        Rent.objects.filter(pk__in=rent_ids).update(id=F('id'))
+
+
+def _booked_message(start_date, end_date):
+    return f"Жилье уже забронированно c {start_date.strftime('%d.%m.%Y')} по {end_date.strftime('%d.%m.%Y')}"
+
+
+def create_booking(serializer, lessee):
+    start_date = serializer.validated_data.get('start_date')
+    end_date = serializer.validated_data.get('end_date')
+    rent = serializer.validated_data.get('rent')
+
+    with transaction.atomic():
+        lock_rent(rent.pk)
+
+        # Одним запросом: сначала подтвержденные брони, затем собственные заявки пользователя
+        conflict = (
+            Booking.objects
+            .filter(rent=rent)
+            .overlapping(start_date, end_date)
+            .filter(Q(status=WaitingStatus.CONFIRMED.name) | Q(lessee=lessee))
+            .annotate(confirmed_first=Case(
+                When(status=WaitingStatus.CONFIRMED.name, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField()
+            ))
+            .order_by('confirmed_first')
+            .values('status', 'start_date', 'end_date')
+            .first()
+        )
+
+        if conflict is not None:
+            if conflict['status'] == WaitingStatus.CONFIRMED.name:
+                raise PermissionDenied(_booked_message(start_date, end_date))
+            raise PermissionDenied(
+                f"Вы уже подали бронь на это объявление с {conflict['start_date'].strftime('%d.%m.%Y')} "
+                f"по {conflict['end_date'].strftime('%d.%m.%Y')}"
+            )
+
+        return serializer.save(lessee=lessee)
+
+
+# Из какого статуса допустим переход в новый
+STATUS_SOURCES = {
+    WaitingStatus.CONFIRMED.name: WaitingStatus.PENDING.name,
+    WaitingStatus.DECLINED.name: WaitingStatus.PENDING.name,
+    WaitingStatus.CANCELLED.name: WaitingStatus.CONFIRMED.name,
+}
+
+STATUS_SOURCE_ERRORS = {
+    WaitingStatus.PENDING.name: "Подтверждать/отклонять можно только заявки в статусе 'В ожидании'",
+    WaitingStatus.CONFIRMED.name: "Отменить можно только подтвержденные бронирования",
+}
+
+
+def change_status(booking, new_status):
+    with transaction.atomic():
+        # Любой переход идет под блокировкой объявления: иначе отклонение,
+        # пришедшее одновременно с подтверждением, перезапишет уже подтвержденную бронь
+        lock_rent(booking.rent_id)
+
+        # Статус мог измениться, пока ждали блокировку
+        booking.refresh_from_db(fields=['status'])
+        source = STATUS_SOURCES[new_status]
+        if booking.status != source:
+            raise PermissionDenied(STATUS_SOURCE_ERRORS[source])
+
+        if new_status == WaitingStatus.CONFIRMED.name:
+            is_booked = (
+                Booking.objects
+                .filter(rent_id=booking.rent_id)
+                .confirmed()
+                .overlapping(booking.start_date, booking.end_date)
+                .exclude(pk=booking.pk)
+                .exists()
+            )
+            if is_booked:
+                raise PermissionDenied(_booked_message(booking.start_date, booking.end_date))
+
+        booking.status = new_status
+        booking.save()
+
+        if new_status == WaitingStatus.CONFIRMED.name:
+            decline_overlapping([booking])
+        return booking
+
+
+def decline_overlapping(confirmed_bookings):
+    """
+    Отклоняет одним UPDATE все заявки в ожидании, пересекающиеся с подтвержденными бронями.
+    Вызывается внутри транзакции подтверждения, под блокировкой объявления.
+    """
+    conflicts = Q()
+    for booking in confirmed_bookings:
+        conflicts |= Q(rent_id=booking.rent_id,
+                       start_date__lte=booking.end_date,
+                       end_date__gte=booking.start_date)
+    if not conflicts:
+        return []
+
+    declined = list(
+        Booking.objects
+        .select_related('lessee', 'rent__owner')
+        .filter(conflicts, status=WaitingStatus.PENDING.name)
+    )
+    if not declined:
+        return []
+
+    now = timezone.now()
+    Booking.objects.filter(
+        pk__in=[booking.pk for booking in declined],
+        status=WaitingStatus.PENDING.name
+    ).update(status=WaitingStatus.DECLINED.name, updated_at=now)
+
+    for booking in declined:
+        booking.status = WaitingStatus.DECLINED.name
+        booking.updated_at = now
+
+    invalidate_availability([booking.rent_id for booking in declined])
+    enqueue_status_messages(declined)
+    return declined
+
+
+def _overlaps(booking, others):
+    return any(other.start_date <= booking.end_date and other.end_date >= booking.start_date
+               for other in others)
+
+
+def bulk_change_status(booking_ids, new_status, user):
+    """
+    Подтверждает или отклоняет несколько заявок одной транзакцией.
+    Правила те же, что у partial_update; возвращает результат по каждой заявке.
+    """
+    results = {}
+
+    with transaction.atomic():
+        rent_ids = set(
+            Booking.objects.filter(pk__in=booking_ids, rent_owner=user).values_list('rent_id', flat=True)
+        )
+        lock_rents(rent_ids)
+
+        bookings = {
+            booking.pk: booking
+            for booking in Booking.objects.select_related('lessee', 'rent__owner').filter(pk__in=booking_ids)
+        }
+
+        candidates = []
+        for booking_id in booking_ids:
+            booking = bookings.get(booking_id)
+            if booking is None:
+                results[booking_id] = "Бронирование не найдено"
+            elif booking.rent.owner_id != user.pk:
+                results[booking_id] = "Только владелец объявления может изменить статус брони"
+            elif booking.status != WaitingStatus.PENDING.name:
+                results[booking_id] = "Подтверждать/отклонять можно только заявки в статусе 'В ожидании'"
+            else:
+                candidates.append(booking)
+
+        if new_status == WaitingStatus.CONFIRMED.name and candidates:
+            # Уже подтвержденные брони за весь охваченный период — одним запросом
+            bounds = Booking.objects.filter(pk__in=[b.pk for b in candidates]).aggregate(
+                start=Min('start_date'), end=Max('end_date')
+            )
+            confirmed = {}
+            for booking in (Booking.objects
+                            .filter(rent_id__in=rent_ids)
+                            .confirmed()
+                            .overlapping(bounds['start'], bounds['end'])
+                            .only('rent_id', 'start_date', 'end_date')):
+                confirmed.setdefault(booking.rent_id, []).append(booking)
+
+            accepted = []
+            for booking in sorted(candidates, key=lambda b: (b.start_date, b.pk)):
+                taken = confirmed.setdefault(booking.rent_id, [])
+                if _overlaps(booking, taken):
+                    results[booking.pk] = _booked_message(booking.start_date, booking.end_date)
+                else:
+                    taken.append(booking)
+                    accepted.append(booking)
+            candidates = accepted
+
+        if candidates:
+            now = timezone.now()
+            Booking.objects.filter(
+                pk__in=[booking.pk for booking in candidates],
+                status=WaitingStatus.PENDING.name
+            ).update(status=new_status, updated_at=now)
+
+            for booking in candidates:
+                booking.status = new_status
+                booking.updated_at = now
+                results[booking.pk] = None
+
+            # update() не вызывает сигналы модели
+            invalidate_availability([booking.rent_id for booking in candidates])
+            if new_status == WaitingStatus.CONFIRMED.name:
+                record_occupancy(candidates)
+            enqueue_status_messages(candidates)
+
+            if new_status == WaitingStatus.CONFIRMED.name:
+                for booking in decline_overlapping(candidates):
+                    if booking.pk in results:
+                        results[booking.pk] = (f"{results[booking.pk]}. "
+                                               f"Заявка отклонена автоматически")
+
+    return [
+        {'id': booking_id, 'ok': results[booking_id] is None, 'detail': results[booking_id] or new_status}
+        for booking_id in booking_ids
+    ]
+
+
+def expire_pending_bookings(grace_days=0, chunk_size=1000):
+    """
+    Переводит в EXPIRED заявки в ожидании, дата заезда которых прошла более grace_days дней назад.
+    Работает порциями по индексу booking_status_date_idx (status, start_date).
+    """
+    cutoff = timezone.now().date() - timedelta(days=grace_days)
+    stale = (
+        Booking.objects
+        .filter(status=WaitingStatus.PENDING.name, start_date__lt=cutoff)
+        .order_by('status', 'start_date')
+    )
+
+    expired = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(stale.values_list('pk', 'rent_id')[:chunk_size])
+            if not chunk:
+                break
+
+            expired += Booking.objects.filter(
+                pk__in=[pk for pk, _ in chunk],
+                status=WaitingStatus.PENDING.name
+            ).update(status=WaitingStatus.EXPIRED.name, updated_at=timezone.now())
+            invalidate_availability([rent_id for _, rent_id in chunk])
+
+    return expired
@@ -1,57 +1,60 @@
-from django.core.mail import EmailMultiAlternatives
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.template.loader import render_to_string
 
-from applications.bookings.models import Booking
+from applications.bookings.availability import invalidate_availability
 from applications.bookings.choices.waiting_status import WaitingStatus
+from applications.bookings.models import Booking, OccupancyDay
+from applications.bookings.notifications import build_status_message
+from applications.bookings.occupancy import record_occupancy, clear_occupancy
+from applications.notifications.outbox import enqueue
+from applications.rent.models.rent import Rent
+
+
+# Поля, от которых зависят календарь занятости и дневные срезы
+BOOKED_PERIOD_FIELDS = ('status', 'start_date', 'end_date', 'rent')
 
 
 @receiver(post_save, sender=Booking)
-def send_booking_status_changed(sender, instance, created, **kwargs):
-    status_subjects = {
-        WaitingStatus.PENDING.name: "Новое бронирование создано",
-        WaitingStatus.CONFIRMED.name: "Бронирование подтверждено",
-        WaitingStatus.DECLINED.name: "Бронирование отклонено",
-        WaitingStatus.CANCELLED.name: "Бронирование отменено",
-    }
-
-    subject = status_subjects.get(instance.status, "Статус бронирования изменен")
-    sender = "HomeRentEasy@net.net"
-
-    if created:
-        recipient = instance.rent.owner.email
-        recipient_name = instance.rent.owner.first_name
-        text_status = "Статус бронирования на Ваше объявление изменился на:"
-    else:
-        recipient = instance.lessee.email
-        recipient_name = instance.lessee.first_name
-        text_status = "Статус Вашего бронирования изменился на:"
-
-
-    context = {
-        "booking": instance,
-        "recipient_name": recipient_name,
-        "text_status": text_status,
-    }
-
-    text_content = render_to_string(
-        template_name='booking_status_changed.txt',
-        context=context
-    )
+def reset_rent_availability(sender, instance, created, **kwargs):
+    if created or instance.has_changed(*BOOKED_PERIOD_FIELDS):
+        rent_ids = [instance.rent_id]
+        if instance.has_changed('rent'):
+            rent_ids.append(instance.previous('rent'))
+        invalidate_availability(rent_ids)
 
-    html_content = render_to_string(
-        template_name='booking_status_changed.html',
-        context=context
-    )
 
-    msg = EmailMultiAlternatives(
-        subject=subject,
-        body=text_content,
-        from_email=sender,
-        to=[recipient],
-        headers={'List-Unsubscribe': '<mailto:unsub@example.com>'}
+@receiver(post_delete, sender=Booking)
+def reset_rent_availability_on_delete(sender, instance, **kwargs):
+    invalidate_availability([instance.rent_id])
+
+
+@receiver(post_save, sender=Booking)
+def update_occupancy(sender, instance, created, **kwargs):
+    if not created:
+        if not instance.has_changed(*BOOKED_PERIOD_FIELDS):
+            return
+        clear_occupancy([instance])
+    if instance.status == WaitingStatus.CONFIRMED.name:
+        record_occupancy([instance])
+
+
+@receiver(post_save, sender=Rent)
+def sync_booking_rent_owner(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'owner' not in update_fields):
+        return
+    Booking.objects.filter(rent=instance).exclude(rent_owner_id=instance.owner_id).update(
+        rent_owner_id=instance.owner_id
+    )
+    OccupancyDay.objects.filter(rent=instance).exclude(rent_owner_id=instance.owner_id).update(
+        rent_owner_id=instance.owner_id
     )
 
-    msg.attach_alternative(html_content, 'text/html')
-    msg.send()
+
+@receiver(post_save, sender=Booking)
+def send_booking_status_changed(sender, instance, created, **kwargs):
+    if not created and not instance.has_changed('status'):
+        return
+    # О новой заявке пишем владельцу, а у объявления его может не быть
+    if created and instance.rent.owner is None:
+        return
+    enqueue(build_status_message(instance, created))
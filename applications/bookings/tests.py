@@ -1,3 +1,615 @@
-from django.test import TestCase
+import datetime
+import io
+import threading
+import time
+from decimal import Decimal
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.test import APITestCase
+
+from applications.bookings.choices.waiting_status import WaitingStatus
+from applications.bookings.models import Booking, OccupancyDay
+from applications.bookings.notifications import STATUS_SUBJECTS
+from applications.bookings.serializers import BookingCreateSerializer
+from applications.bookings.services import create_booking, change_status, bulk_change_status
+from applications.factories import make_user, make_rent
+from applications.notifications.models import OutboxMessage
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class BookingConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+    LOCK_RETRIES = 50
+
+    def setUp(self):
+        mail.outbox = []
+        self.owner = make_user('owner', 'LESSOR')
+        self.rent = make_rent(self.owner)
+        self.start_date = datetime.date.today() + datetime.timedelta(days=10)
+
+    def _run_in_parallel(self, targets):
+        barrier = threading.Barrier(len(targets))
+        outcomes = []
+
+        def worker(target):
+            barrier.wait()
+            try:
+                for attempt in range(self.LOCK_RETRIES):
+                    try:
+                        target()
+                        outcomes.append('ok')
+                        return
+                    except OperationalError:
+                        # SQLite в shared cache сразу отвечает "table is locked" — повторяем как клиент
+                        time.sleep(0.01 * (attempt + 1))
+                outcomes.append('locked')
+            except PermissionDenied:
+                outcomes.append('rejected')
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def _assert_no_confirmed_overlaps(self):
+        confirmed = list(
+            Booking.objects.filter(rent=self.rent, status=WaitingStatus.CONFIRMED.name).order_by('start_date')
+        )
+        for previous, current in zip(confirmed, confirmed[1:]):
+            self.assertGreater(current.start_date, previous.end_date)
+
+    def test_parallel_confirmations_do_not_overlap(self):
+        # Каждая заявка пересекается со всеми остальными: подтвердить можно только одну
+        bookings = [
+            Booking.objects.create(
+                lessee=make_user(f'lessee{i}', 'LESSEE'),
+                rent=self.rent,
+                start_date=self.start_date + datetime.timedelta(days=i),
+                end_date=self.start_date + datetime.timedelta(days=i + self.THREADS),
+            )
+            for i in range(self.THREADS)
+        ]
+
+        outcomes = self._run_in_parallel([
+            lambda booking=booking: change_status(booking, WaitingStatus.CONFIRMED.name)
+            for booking in bookings
+        ])
+
+        self.assertEqual(outcomes.count('ok'), 1)
+        self.assertEqual(outcomes.count('rejected'), self.THREADS - 1)
+        statuses = list(Booking.objects.filter(rent=self.rent).values_list('status', flat=True))
+        self.assertEqual(statuses.count(WaitingStatus.CONFIRMED.name), 1)
+        self.assertEqual(statuses.count(WaitingStatus.DECLINED.name), self.THREADS - 1)
+        self._assert_no_confirmed_overlaps()
+
+    def test_parallel_confirm_and_decline_apply_one_transition(self):
+        booking = Booking.objects.create(
+            lessee=make_user('lessee', 'LESSEE'),
+            rent=self.rent,
+            start_date=self.start_date,
+            end_date=self.start_date + datetime.timedelta(days=3),
+        )
+        other = Booking.objects.create(
+            lessee=make_user('other', 'LESSEE'),
+            rent=self.rent,
+            start_date=self.start_date + datetime.timedelta(days=1),
+            end_date=self.start_date + datetime.timedelta(days=4),
+        )
+
+        # У каждого потока своя копия брони со статусом PENDING в памяти
+        outcomes = self._run_in_parallel([
+            lambda: change_status(Booking.objects.get(pk=booking.pk), WaitingStatus.CONFIRMED.name),
+            lambda: change_status(Booking.objects.get(pk=booking.pk), WaitingStatus.DECLINED.name),
+        ])
+
+        self.assertEqual(sorted(outcomes), ['ok', 'rejected'])
+        booking.refresh_from_db()
+        other.refresh_from_db()
+        self.assertIn(booking.status, [WaitingStatus.CONFIRMED.name, WaitingStatus.DECLINED.name])
+        if booking.status == WaitingStatus.CONFIRMED.name:
+            self.assertEqual(other.status, WaitingStatus.DECLINED.name)
+        else:
+            self.assertEqual(other.status, WaitingStatus.PENDING.name)
+
+    def test_parallel_creates_by_same_lessee_insert_one_booking(self):
+        lessee = make_user('lessee', 'LESSEE')
+
+        def make_create(offset):
+            def create():
+                serializer = BookingCreateSerializer(data={
+                    'rent': self.rent.pk,
+                    'start_date': self.start_date + datetime.timedelta(days=offset),
+                    'end_date': self.start_date + datetime.timedelta(days=offset + self.THREADS),
+                })
+                serializer.is_valid(raise_exception=True)
+                create_booking(serializer, lessee=lessee)
+            return create
+
+        outcomes = self._run_in_parallel([make_create(offset) for offset in range(self.THREADS)])
+
+        self.assertEqual(outcomes.count('ok'), 1)
+        self.assertEqual(Booking.objects.filter(rent=self.rent, lessee=lessee).count(), 1)
+
+
+class RentOwnerDenormalizationTests(TestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'LESSOR')
+        self.lessee = make_user('lessee', 'LESSEE')
+        self.rent = make_rent(self.owner)
+        self.start_date = datetime.date.today() + datetime.timedelta(days=10)
+
+    def _booking(self, status=WaitingStatus.PENDING.name):
+        return Booking.objects.create(
+            lessee=self.lessee,
+            rent=self.rent,
+            start_date=self.start_date,
+            end_date=self.start_date + datetime.timedelta(days=3),
+            status=status
+        )
+
+    def test_deleting_owner_keeps_bookings(self):
+        booking = self._booking()
+        self.assertEqual(booking.rent_owner_id, self.owner.pk)
+
+        self.owner.delete()
+
+        booking.refresh_from_db()
+        self.assertIsNone(booking.rent_owner_id)
+
+    def test_deleting_owner_keeps_occupancy(self):
+        booking = self._booking(WaitingStatus.CONFIRMED.name)
+
+        self.owner.delete()
+
+        self.assertEqual(OccupancyDay.objects.filter(booking=booking, rent_owner__isnull=True).count(), 3)
+
+    def test_clearing_rent_owner_clears_occupancy_owner(self):
+        self._booking(WaitingStatus.CONFIRMED.name)
+
+        self.rent.owner = None
+        self.rent.save()
+
+        self.assertFalse(OccupancyDay.objects.filter(rent_owner__isnull=False).exists())
+
+    def test_clearing_rent_owner_clears_copies(self):
+        booking = self._booking()
+
+        self.rent.owner = None
+        self.rent.save()
+
+        booking.refresh_from_db()
+        self.assertIsNone(booking.rent_owner_id)
+
+    def test_booking_on_rent_without_owner(self):
+        self.rent.owner = None
+        self.rent.save()
+
+        booking = self._booking(WaitingStatus.CONFIRMED.name)
+
+        self.assertIsNone(booking.rent_owner_id)
+        self.assertEqual(OccupancyDay.objects.filter(booking=booking).count(), 3)
+
+
+class BookingPeriodTests(APITestCase):
+    """Период брони — с start_date по end_date включительно во всех местах, где сравниваются даты."""
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user('owner', 'LESSOR')
+        self.lessee = make_user('lessee', 'LESSEE')
+        self.rent = make_rent(self.owner)
+        self.start_date = datetime.date.today() + datetime.timedelta(days=10)
+
+    def day(self, offset):
+        return self.start_date + datetime.timedelta(days=offset)
+
+    def _booking(self, start, end, status=WaitingStatus.PENDING.name):
+        return Booking.objects.create(
+            lessee=self.lessee, rent=self.rent, start_date=self.day(start), end_date=self.day(end), status=status
+        )
+
+    def test_end_date_is_booked(self):
+        first = self._booking(0, 3)
+        second = self._booking(3, 5)
+
+        change_status(first, WaitingStatus.CONFIRMED.name)
+
+        second.refresh_from_db()
+        self.assertEqual(second.status, WaitingStatus.DECLINED.name)
+
+    def test_next_day_after_end_date_is_free(self):
+        first = self._booking(0, 3)
+        second = self._booking(4, 6)
+
+        change_status(first, WaitingStatus.CONFIRMED.name)
+        second.refresh_from_db()
+        self.assertEqual(second.status, WaitingStatus.PENDING.name)
+
+        change_status(second, WaitingStatus.CONFIRMED.name)
+        self.assertEqual(Booking.objects.confirmed().count(), 2)
+
+    def test_availability_search_and_feed_agree(self):
+        self._booking(2, 4, WaitingStatus.CONFIRMED.name)
+
+        response = self.client.get(
+            f'/api/v1/rent/{self.rent.pk}/availability/', {'from': self.day(0), 'to': self.day(7)}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['confirmed'], [
+            {'start': self.day(2).isoformat(), 'end': self.day(4).isoformat()},
+        ])
+        self.assertEqual(response.data['free'], [
+            {'start': self.day(0).isoformat(), 'end': self.day(1).isoformat()},
+            {'start': self.day(5).isoformat(), 'end': self.day(7).isoformat()},
+        ])
+
+        def found(check_in, check_out):
+            response = self.client.get(
+                '/api/v1/rent/', {'check_in': self.day(check_in), 'check_out': self.day(check_out)}
+            )
+            self.assertEqual(response.status_code, 200)
+            return len(response.data['results']) == 1
+
+        self.assertTrue(found(0, 1))
+        self.assertTrue(found(5, 6))
+        self.assertFalse(found(4, 6))
+
+        # В iCalendar DTEND не входит в событие: это день после end_date
+        feed = self.client.get(f'/api/v1/rent/{self.rent.pk}/calendar.ics').content.decode()
+        self.assertIn(f"DTSTART;VALUE=DATE:{self.day(2).strftime('%Y%m%d')}", feed)
+        self.assertIn(f"DTEND;VALUE=DATE:{self.day(5).strftime('%Y%m%d')}", feed)
+
+    def test_invalid_periods_rejected_with_plain_messages(self):
+        response = self.client.get(
+            f'/api/v1/rent/{self.rent.pk}/availability/', {'from': self.day(3), 'to': self.day(1)}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'from': 'Начало периода не может быть позже его конца'})
+
+        response = self.client.get('/api/v1/rent/', {'check_in': self.day(3), 'check_out': self.day(1)})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'check_in': 'Дата заезда должна быть раньше даты выезда'})
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/v1/bookings/stats/', {'from': '2026-05', 'to': '2026-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'from': 'Начальный месяц не может быть позже конечного'})
+
+
+class BookingListPaginationTests(APITestCase):
+    PAGE_SIZE = 3
+
+    def setUp(self):
+        self.lessee = make_user('lessee', 'LESSEE')
+        rent = make_rent(make_user('owner', 'LESSOR'))
+        today = datetime.date.today()
+        # Одинаковые даты заезда: порядок внутри них задает id
+        for offset in [5, 1, 3, 1, 5, 2, 1, 4]:
+            start = today + datetime.timedelta(days=10 + offset)
+            Booking.objects.create(
+                lessee=self.lessee, rent=rent, start_date=start,
+                end_date=start + datetime.timedelta(days=Booking.objects.filter(start_date=start).count() + 1)
+            )
+        self.client.force_authenticate(self.lessee)
+
+    def walk(self, ordering):
+        response = self.client.get('/api/v1/bookings/', {'ordering': ordering, 'page_size': self.PAGE_SIZE})
+        pages = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append([row['id'] for row in response.data['results']])
+            if response.data['next'] is None:
+                return pages, response
+            response = self.client.get(response.data['next'])
+
+    def expected(self, *order_by):
+        ids = list(Booking.objects.order_by(*order_by).values_list('id', flat=True))
+        return [ids[i:i + self.PAGE_SIZE] for i in range(0, len(ids), self.PAGE_SIZE)]
+
+    def test_pages_follow_composite_key(self):
+        pages, _ = self.walk('start_date')
+        self.assertEqual(pages, self.expected('start_date', 'id'))
+
+        pages, _ = self.walk('-start_date')
+        self.assertEqual(pages, self.expected('-start_date', '-id'))
+
+    def test_previous_links_return_same_pages(self):
+        pages, response = self.walk('start_date')
+
+        backwards = [pages[-1]]
+        while response.data['previous'] is not None:
+            response = self.client.get(response.data['previous'])
+            self.assertEqual(response.status_code, 200)
+            backwards.append([row['id'] for row in response.data['results']])
+
+        self.assertEqual(backwards[::-1], pages)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/v1/bookings/', {'ordering': 'start_date', 'cursor': 'broken'})
+        self.assertEqual(response.status_code, 404)
+
+
+class AvailabilityCacheTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user('owner', 'LESSOR')
+        self.lessee = make_user('lessee', 'LESSEE')
+        self.rent = make_rent(self.owner)
+        self.start_date = datetime.date.today() + datetime.timedelta(days=10)
+        self.booking = Booking.objects.create(
+            lessee=self.lessee, rent=self.rent, start_date=self.start_date,
+            end_date=self.start_date + datetime.timedelta(days=2)
+        )
+
+    def availability(self):
+        response = self.client.get(f'/api/v1/rent/{self.rent.pk}/availability/', {
+            'from': self.start_date, 'to': self.start_date + datetime.timedelta(days=5)
+        })
+        self.assertEqual(response.status_code, 200)
+        return len(response.data['confirmed']), len(response.data['pending'])
+
+    def test_confirm_and_cancel_reset_cached_availability(self):
+        self.assertEqual(self.availability(), (0, 1))
+
+        # Версия доступности меняется после коммита
+        with self.captureOnCommitCallbacks(execute=True):
+            change_status(self.booking, WaitingStatus.CONFIRMED.name)
+        self.assertEqual(self.availability(), (1, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            change_status(self.booking, WaitingStatus.CANCELLED.name)
+        self.assertEqual(self.availability(), (0, 0))
+
+    def test_bulk_confirm_resets_cached_availability(self):
+        self.assertEqual(self.availability(), (0, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_change_status([self.booking.pk], WaitingStatus.CONFIRMED.name, self.owner)
+        self.assertEqual(self.availability(), (1, 0))
+
+    def test_cached_until_bookings_change(self):
+        self.assertEqual(self.availability(), (0, 1))
+
+        # Изменение в обход сигналов кэш не сбрасывает: ответ берется из кэша
+        Booking.objects.filter(pk=self.booking.pk).update(status=WaitingStatus.DECLINED.name)
+        self.assertEqual(self.availability(), (0, 1))
+
+
+class BulkStatusTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'LESSOR')
+        self.lessees = [make_user(f'lessee{i}', 'LESSEE') for i in range(3)]
+        self.rent = make_rent(self.owner)
+        self.foreign_rent = make_rent(make_user('stranger', 'LESSOR'), 'Чужая квартира')
+        self.start_date = datetime.date.today() + datetime.timedelta(days=10)
+
+    def _booking(self, lessee, start, end, rent=None, status=WaitingStatus.PENDING.name):
+        return Booking.objects.create(
+            lessee=lessee, rent=rent or self.rent, status=status,
+            start_date=self.start_date + datetime.timedelta(days=start),
+            end_date=self.start_date + datetime.timedelta(days=end)
+        )
+
+    def bulk(self, ids, new_status):
+        return self.client.patch('/api/v1/bookings/bulk-status/', {'ids': ids, 'status': new_status}, format='json')
+
+    def test_partial_failure_reported_per_booking(self):
+        first = self._booking(self.lessees[0], 0, 3)
+        overlapping = self._booking(self.lessees[1], 2, 5)
+        separate = self._booking(self.lessees[2], 6, 8)
+        foreign = self._booking(self.lessees[0], 0, 3, rent=self.foreign_rent)
+        declined = self._booking(self.lessees[2], 10, 12, status=WaitingStatus.DECLINED.name)
+
+        self.client.force_authenticate(self.owner)
+        ids = [first.pk, overlapping.pk, separate.pk, foreign.pk, declined.pk, 999999]
+        response = self.bulk(ids, WaitingStatus.CONFIRMED.name)
+
+        self.assertEqual(response.status_code, 200)
+        results = {row['id']: row['ok'] for row in response.data['results']}
+        self.assertEqual([row['id'] for row in response.data['results']], ids)
+        self.assertEqual(results, {
+            first.pk: True, overlapping.pk: False, separate.pk: True,
+            foreign.pk: False, declined.pk: False, 999999: False,
+        })
+        self.assertEqual(
+            dict(Booking.objects.values_list('pk', 'status')),
+            {
+                first.pk: WaitingStatus.CONFIRMED.name,
+                overlapping.pk: WaitingStatus.DECLINED.name,
+                separate.pk: WaitingStatus.CONFIRMED.name,
+                foreign.pk: WaitingStatus.PENDING.name,
+                declined.pk: WaitingStatus.DECLINED.name,
+            }
+        )
+
+    def test_only_rent_owner_changes_status(self):
+        booking = self._booking(self.lessees[0], 0, 3)
+
+        self.assertEqual(self.bulk([booking.pk], WaitingStatus.CONFIRMED.name).status_code, 401)
+
+        self.client.force_authenticate(self.lessees[0])
+        response = self.bulk([booking.pk], WaitingStatus.CONFIRMED.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [{
+            'id': booking.pk, 'ok': False, 'detail': 'Только владелец объявления может изменить статус брони'
+        }])
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, WaitingStatus.PENDING.name)
+
+    def test_invalid_payload(self):
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.bulk([], WaitingStatus.CONFIRMED.name).status_code, 400)
+        self.assertEqual(self.bulk([1], WaitingStatus.CANCELLED.name).status_code, 400)
+
+
+class AutoDeclineTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'LESSOR')
+        self.lessees = [make_user(f'lessee{i}', 'LESSEE') for i in range(3)]
+        self.rent = make_rent(self.owner)
+        start = datetime.date.today() + datetime.timedelta(days=10)
+        self.bookings = [
+            Booking.objects.create(
+                lessee=lessee, rent=self.rent,
+                start_date=start + datetime.timedelta(days=offset),
+                end_date=start + datetime.timedelta(days=offset + 3)
+            )
+            for lessee, offset in zip(self.lessees, [0, 2, 4])
+        ]
+        OutboxMessage.objects.all().delete()
+
+    def test_confirming_declines_overlapping_pending_and_notifies(self):
+        confirmed, overlapping, separate = self.bookings
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(
+            f'/api/v1/bookings/{confirmed.pk}/', {'status': WaitingStatus.CONFIRMED.name}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(
+            [Booking.objects.get(pk=booking.pk).status for booking in self.bookings],
+            [WaitingStatus.CONFIRMED.name, WaitingStatus.DECLINED.name, WaitingStatus.PENDING.name]
+        )
+        self.assertCountEqual(
+            OutboxMessage.objects.values_list('to', 'subject'),
+            [
+                (['lessee0@example.com'], STATUS_SUBJECTS[WaitingStatus.CONFIRMED.name]),
+                (['lessee1@example.com'], STATUS_SUBJECTS[WaitingStatus.DECLINED.name]),
+            ]
+        )
+
+    def test_declined_booking_cannot_be_confirmed_later(self):
+        confirmed, overlapping, _ = self.bookings
+        change_status(confirmed, WaitingStatus.CONFIRMED.name)
+
+        self.client.force_authenticate(self.owner)
+        response = self.client.patch(
+            f'/api/v1/bookings/{overlapping.pk}/', {'status': WaitingStatus.CONFIRMED.name}, format='json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class ExpirePendingBookingsTests(TestCase):
+
+    def setUp(self):
+        self.lessee = make_user('lessee', 'LESSEE')
+        self.rent = make_rent(make_user('owner', 'LESSOR'))
+        self.today = datetime.date.today()
+
+    def _booking(self, start, status=WaitingStatus.PENDING.name):
+        start_date = self.today + datetime.timedelta(days=start)
+        return Booking.objects.create(
+            lessee=self.lessee, rent=self.rent, status=status,
+            start_date=start_date, end_date=start_date + datetime.timedelta(days=1)
+        )
+
+    def expire(self, *args):
+        out = io.StringIO()
+        call_command('expire_pending_bookings', '--chunk-size', '1', *args, stdout=out)
+        return out.getvalue()
+
+    def statuses(self):
+        return dict(Booking.objects.values_list('pk', 'status'))
+
+    def test_expires_only_stale_pending(self):
+        stale = [self._booking(-10), self._booking(-3)]
+        today = self._booking(0)
+        confirmed = self._booking(-20, WaitingStatus.CONFIRMED.name)
+
+        self.assertIn('Истекших заявок: 2', self.expire())
+        self.assertEqual(self.statuses(), {
+            stale[0].pk: WaitingStatus.EXPIRED.name,
+            stale[1].pk: WaitingStatus.EXPIRED.name,
+            today.pk: WaitingStatus.PENDING.name,
+            confirmed.pk: WaitingStatus.CONFIRMED.name,
+        })
+        self.assertIn('Истекших заявок: 0', self.expire())
+
+    def test_grace_days(self):
+        old = self._booking(-10)
+        recent = self._booking(-3)
+
+        self.assertIn('Истекших заявок: 1', self.expire('--grace-days', '5'))
+        self.assertEqual(self.statuses(), {
+            old.pk: WaitingStatus.EXPIRED.name,
+            recent.pk: WaitingStatus.PENDING.name,
+        })
+
+
+class OccupancyStatsTests(APITestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'LESSOR')
+        self.lessee = make_user('lessee', 'LESSEE')
+        self.rent = make_rent(self.owner, price=50)
+        self.other_rent = make_rent(make_user('stranger', 'LESSOR'), 'Чужая квартира', price=80)
+        # Три ночи на стыке месяцев: 30 и 31 января, 1 февраля
+        self.booking = self._booking(self.rent, datetime.date(2026, 1, 30), datetime.date(2026, 2, 2))
+        self._booking(self.other_rent, datetime.date(2026, 1, 10), datetime.date(2026, 1, 12))
+
+    def _booking(self, rent, start_date, end_date):
+        return Booking.objects.create(
+            lessee=self.lessee, rent=rent, start_date=start_date, end_date=end_date,
+            status=WaitingStatus.CONFIRMED.name
+        )
+
+    def stats(self, **params):
+        self.client.force_authenticate(self.owner)
+        response = self.client.get('/api/v1/bookings/stats/', {'from': '2026-01', 'to': '2026-02', **params})
+        self.assertEqual(response.status_code, 200)
+        return [
+            (row['rent'], row['month'], row['nights'], row['occupancy'], row['revenue'])
+            for row in response.data['results']
+        ]
+
+    def test_monthly_rollups_of_own_rents(self):
+        self.assertEqual(self.stats(), [
+            (self.rent.pk, '2026-01', 2, round(2 / 31, 3), Decimal('100')),
+            (self.rent.pk, '2026-02', 1, round(1 / 28, 3), Decimal('50')),
+        ])
+        self.assertEqual(self.stats(rent=self.other_rent.pk), [])
+
+    def test_cancellation_removes_nights(self):
+        self.booking.status = WaitingStatus.CANCELLED.name
+        self.booking.save()
+
+        self.assertEqual(self.stats(), [])
+
+    def test_rebuild_restores_rollups(self):
+        expected = self.stats()
+        OccupancyDay.objects.all().delete()
+
+        out = io.StringIO()
+        call_command('rebuild_occupancy_rollups', '--chunk-size', '1', stdout=out)
+
+        self.assertIn('Подтвержденных броней: 2', out.getvalue())
+        self.assertEqual(self.stats(), expected)
+
+    def test_overlapping_confirmed_booking_is_logged(self):
+        with self.assertLogs('applications.bookings.occupancy', 'ERROR') as logs:
+            overlapping = self._booking(self.rent, datetime.date(2026, 2, 1), datetime.date(2026, 2, 3))
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(
+            list(OccupancyDay.objects.filter(booking=overlapping).values_list('day', flat=True)),
+            [datetime.date(2026, 2, 2)]
+        )
+
+        OccupancyDay.objects.all().delete()
+        with self.assertLogs('applications.bookings.occupancy', 'ERROR'):
+            call_command('rebuild_occupancy_rollups', stdout=io.StringIO())
+        self.assertEqual(OccupancyDay.objects.filter(rent=self.rent).count(), 4)
@@ -1,15 +1,30 @@
-from django.db.models import Q
+import datetime
+
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status
 from rest_framework.exceptions import PermissionDenied, ValidationError
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateAPIView
-from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from rest_framework.generics import ListCreateAPIView, RetrieveUpdateAPIView, get_object_or_404
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS, AllowAny
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from applications.bookings.availability import get_availability
+from applications.bookings.calendar import calendar_etag, calendar_last_modified, render_calendar
 from applications.bookings.choices.waiting_status import WaitingStatus
 from applications.bookings.models import Booking
-from applications.bookings.serializers import BookingListSerializer, BookingCreateSerializer
+from applications.bookings.occupancy import monthly_stats
+from applications.bookings.renderers import ICalendarRenderer
+from applications.bookings.serializers import (BookingListSerializer,
+                                              BookingCreateSerializer,
+                                              BookingBulkStatusSerializer)
+from applications.bookings.services import create_booking, change_status, bulk_change_status
 from applications.permissions.permissions import IsOwnerOrReadOnlyBooking
+from applications.rent.models.rent import Rent
 
 
 class BookingListCreateGenericAPIView(ListCreateAPIView):
@@ -37,45 +52,15 @@ class BookingListCreateGenericAPIView(ListCreateAPIView):
         if user.is_superuser:
             return queryset
 
-        # print(user)
-        # for booking in queryset[:5]:
-        #     print(f"Lessee: {booking.lessee}, Rent owner: {booking.rent.owner}")
-        return queryset.filter(Q(lessee=user) | Q(rent__owner=user))
-
-    def perform_create(self, serializer):
-        start_date = serializer.validated_data.get('start_date')
-        end_date = serializer.validated_data.get('end_date')
-        rent = serializer.validated_data.get('rent')
-        user = self.request.user
-
-        booking = Booking.objects.filter(
-        rent=rent,
-        status=WaitingStatus.CONFIRMED.name,
-        start_date__lte=end_date,
-        end_date__gte=start_date
-    )
-
-        if booking.exists():
-            # print('booking.exists().CONFIRMED', '==' * 50)
-            raise PermissionDenied(
-                f"Жилье уже забронированно c {start_date.strftime('%d.%m.%Y')} по {end_date.strftime('%d.%m.%Y')}"
-            )
-
-        booking = Booking.objects.filter(
-            rent=rent,
-            lessee=user,
-            start_date__lte=end_date,
-            end_date__gte=start_date
+        # UNION двух выборок, каждая по своему индексу; OR по двум колонкам зависел бы от index merge
+        participant = (
+            Booking.objects.filter(lessee=user).order_by().values('pk')
+            .union(Booking.objects.filter(rent_owner=user).order_by().values('pk'))
         )
+        return queryset.filter(pk__in=participant)
 
-        if booking.exists():
-            # print('booking.exists().USER', '==' * 50)
-            existing = booking.first()
-            raise PermissionDenied(
-                f"Вы уже подали бронь на это объявление с {existing.start_date.strftime('%d.%m.%Y')} по {existing.end_date.strftime('%d.%m.%Y')}"
-            )
-
-        serializer.save(lessee=self.request.user)
+    def perform_create(self, serializer):
+        create_booking(serializer, lessee=self.request.user)
 
 
 class BookingDetailUpdateDeleteGenericAPIView(RetrieveUpdateAPIView):
@@ -117,6 +102,114 @@ class BookingDetailUpdateDeleteGenericAPIView(RetrieveUpdateAPIView):
         else:
             raise ValidationError("Недопустимый статус")
 
-        instance.status = new_status
-        instance.save()
+        change_status(instance, new_status)
         return Response(self.get_serializer(instance).data, status=status.HTTP_200_OK)
+
+
+class BookingBulkStatusAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request):
+        serializer = BookingBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = bulk_change_status(
+            serializer.validated_data['ids'],
+            serializer.validated_data['status'],
+            request.user
+        )
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+class RentAvailabilityAPIView(APIView):
+    permission_classes = [AllowAny]
+
+    DEFAULT_WINDOW = datetime.timedelta(days=30)
+    MAX_WINDOW = datetime.timedelta(days=366)
+
+    def get(self, request, rent_id):
+        rent = get_object_or_404(Rent.objects.only('id', 'is_active', 'owner_id'), id=rent_id)
+        if not rent.is_active and rent.owner_id != request.user.pk:
+            raise PermissionDenied("Объявление не доступно")
+
+        date_from = self._parse_date('from') or timezone.now().date()
+        date_to = self._parse_date('to') or date_from + self.DEFAULT_WINDOW
+
+        if date_from > date_to:
+            raise ValidationError({"from": "Начало периода не может быть позже его конца"})
+
+        if date_to - date_from > self.MAX_WINDOW:
+            raise ValidationError({"to": f"Период не может быть больше {self.MAX_WINDOW.days} дней"})
+
+        return Response(get_availability(rent.pk, date_from, date_to), status=status.HTTP_200_OK)
+
+    def _parse_date(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError({param: "Ожидается дата в формате YYYY-MM-DD"})
+
+
+class RentCalendarAPIView(APIView):
+    permission_classes = [AllowAny]
+    renderer_classes = [JSONRenderer, ICalendarRenderer]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        rent = get_object_or_404(Rent.objects.only('id', 'is_active', 'owner_id'), id=kwargs['rent_id'])
+        if not rent.is_active and rent.owner_id != request.user.pk:
+            raise PermissionDenied("Объявление не доступно")
+
+    # Календари опрашивают ленту постоянно: без новых изменений броней отвечаем 304
+    @method_decorator(condition(etag_func=calendar_etag, last_modified_func=calendar_last_modified))
+    def get(self, request, rent_id):
+        response = HttpResponse(render_calendar(rent_id), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="rent-{rent_id}.ics"'
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+
+class OwnerOccupancyStatsAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    DEFAULT_MONTHS = 12
+    MAX_MONTHS = 36
+
+    def get(self, request):
+        today = timezone.now().date()
+        month_to = self._parse_month('to') or today.replace(day=1)
+        month_from = self._parse_month('from') or self._shift_month(month_to, 1 - self.DEFAULT_MONTHS)
+
+        if month_from > month_to:
+            raise ValidationError({"from": "Начальный месяц не может быть позже конечного"})
+
+        if month_from < self._shift_month(month_to, 1 - self.MAX_MONTHS):
+            raise ValidationError({"to": f"Период не может быть больше {self.MAX_MONTHS} месяцев"})
+
+        rent_id = request.query_params.get('rent')
+        if rent_id is not None and not rent_id.isdigit():
+            raise ValidationError({"rent": "Ожидается id объявления"})
+
+        stats = monthly_stats(request.user, month_from, month_to, rent_id=rent_id and int(rent_id))
+        return Response({
+            'from': month_from.strftime('%Y-%m'),
+            'to': month_to.strftime('%Y-%m'),
+            'results': stats,
+        }, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _shift_month(month, delta):
+        index = month.year * 12 + month.month - 1 + delta
+        return datetime.date(index // 12, index % 12 + 1, 1)
+
+    def _parse_month(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return datetime.datetime.strptime(value, '%Y-%m').date()
+        except ValueError:
+            raise ValidationError({param: "Ожидается месяц в формате YYYY-MM"})
@@ -0,0 +1,72 @@
+class DirtyFieldsMixin:
+    """
+    Отслеживает изменения полей модели с момента загрузки из БД.
+
+    save() без update_fields пишет только измененные поля (и поля auto_now),
+    а если ничего не изменилось — не обращается к БД и не шлет сигналы:
+    pre_save/post_save не срабатывают, поля auto_now не обновляются.
+    Чтобы сохранить объект и разослать сигналы безусловно, передайте update_fields.
+    Снимок обновляется после сохранения, поэтому в post_save-обработчиках
+    get_dirty_fields() и previous() еще возвращают старые значения.
+    Для внешних ключей значения хранятся по attname (rent_id), ключи — по имени поля (rent).
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def _tracked_fields(self):
+        return [field for field in self._meta.concrete_fields if not field.primary_key]
+
+    def _snapshot(self, field_names=None):
+        state = getattr(self, '_original_state', {})
+        for field in self._tracked_fields():
+            if field_names is not None and field.name not in field_names and field.attname not in field_names:
+                continue
+            if field.attname in self.__dict__:
+                state[field.attname] = self.__dict__[field.attname]
+        self._original_state = state
+
+    def get_dirty_fields(self) -> dict:
+        """Измененные поля: {имя поля: значение до изменения}."""
+        if self._state.adding:
+            return {}
+
+        original = getattr(self, '_original_state', {})
+        dirty = {}
+        for field in self._tracked_fields():
+            if field.attname not in self.__dict__:
+                continue
+            if field.attname not in original:
+                # Отложенное поле, которому присвоили значение
+                dirty[field.name] = None
+            elif original[field.attname] != self.__dict__[field.attname]:
+                dirty[field.name] = original[field.attname]
+        return dirty
+
+    def has_changed(self, *field_names) -> bool:
+        dirty = self.get_dirty_fields()
+        return any(name in dirty for name in field_names)
+
+    def previous(self, field_name):
+        field = self._meta.get_field(field_name)
+        return getattr(self, '_original_state', {}).get(field.attname)
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot(fields)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if (update_fields is None and not args and not kwargs.get('force_insert')
+                and not self._state.adding and hasattr(self, '_original_state')):
+            dirty = self.get_dirty_fields()
+            if not dirty:
+                return
+            auto_now = [field.name for field in self._tracked_fields() if getattr(field, 'auto_now', False)]
+            kwargs['update_fields'] = update_fields = list(dict.fromkeys([*dirty, *auto_now]))
+
+        super().save(*args, **kwargs)
+        self._snapshot(update_fields)
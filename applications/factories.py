@@ -0,0 +1,29 @@
+from applications.rent.models import Rent, Address
+from applications.users.models import User
+
+PASSWORD = 'StrongPassw0rd!'
+
+
+def make_user(name, role, **extra) -> User:
+    return User.objects.create_user(
+        email=f'{name}@example.com',
+        password=PASSWORD,
+        username=name,
+        role=role,
+        first_name=name,
+        **extra
+    )
+
+
+def make_address(city='Berlin', street='Main', **extra) -> Address:
+    return Address.objects.create(country='DE', city=city, street=street, **extra)
+
+
+def make_rent(owner, title='Квартира', address=None, **extra) -> Rent:
+    fields = {
+        'description': 'Квартира в центре',
+        'price': 50,
+        'room_type': 'LOFT',
+        **extra
+    }
+    return Rent.objects.create(title=title, address=address or make_address(), owner=owner, **fields)
@@ -1,5 +1,27 @@
+import math
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q, F, Value, FloatField
+from django.db.models.functions import Sqrt
 from django_filters import rest_framework as filters
-from applications.rent.models.rent import Rent
+from rest_framework.exceptions import ValidationError
+
+from applications.bookings.models import Booking
+from applications.rent.geo import cover_cells, radius_bbox, next_prefix, KM_PER_DEGREE
+from applications.rent.models.locations import Address
+from applications.rent.models.listing import RentListing
+from applications.search.choices.trigram_kind import TrigramKind
+from applications.search.fuzzy import match_values
+from applications.users.models.user import User
+
+
+def _cell_range(cell):
+    # Диапазон по индексу geohash вместо LIKE
+    upper = next_prefix(cell)
+    if upper is None:
+        return Q(geohash__gte=cell)
+    return Q(geohash__gte=cell, geohash__lt=upper)
 
 
 class RentFilter(filters.FilterSet):
@@ -7,14 +29,117 @@ class RentFilter(filters.FilterSet):
     price_max = filters.NumberFilter(field_name='price', lookup_expr='lte')
     rooms_min = filters.NumberFilter(field_name='rooms_count', lookup_expr='gte')
     rooms_max = filters.NumberFilter(field_name='rooms_count', lookup_expr='lte')
-    city = filters.CharFilter(field_name='address__city', lookup_expr='icontains')
+    city = filters.CharFilter(method='filter_city')
     room_type = filters.CharFilter(field_name='room_type', lookup_expr='exact')
-    owner = filters.CharFilter(field_name='owner__username', lookup_expr='icontains')
+    owner = filters.CharFilter(method='filter_owner')
     rating_min = filters.NumberFilter(field_name='avg_rating', lookup_expr='gte')
     rating_max = filters.NumberFilter(field_name='avg_rating', lookup_expr='lte')
     views_min = filters.NumberFilter(field_name='cn_views', lookup_expr='gte')
     views_max = filters.NumberFilter(field_name='cn_views', lookup_expr='lte')
+    lat = filters.NumberFilter(method='filter_geo')
+    lng = filters.NumberFilter(method='filter_geo')
+    radius_km = filters.NumberFilter(method='filter_geo')
+    bbox = filters.CharFilter(method='filter_geo')
+    check_in = filters.DateFilter(method='filter_availability')
+    check_out = filters.DateFilter(method='filter_availability')
+
+    MAX_RADIUS_KM = 500
 
     class Meta:
-        model = Rent
+        model = RentListing
         fields = []
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        queryset = self._available(queryset)
+        return self._near(queryset)
+
+    def filter_availability(self, queryset, name, value):
+        # check_in и check_out применяются вместе в filter_queryset
+        return queryset
+
+    def _available(self, queryset):
+        check_in = self.form.cleaned_data.get('check_in')
+        check_out = self.form.cleaned_data.get('check_out')
+
+        if check_in is None and check_out is None:
+            return queryset
+
+        if check_in is None or check_out is None:
+            raise ValidationError({'check_in': 'Укажите обе даты: check_in и check_out'})
+
+        if check_in >= check_out:
+            raise ValidationError({'check_in': 'Дата заезда должна быть раньше даты выезда'})
+
+        # Один анти-подзапрос по booking_availability_idx вместо проверки каждого объявления
+        busy = Booking.objects.confirmed().overlapping(check_in, check_out).values('rent_id')
+        return queryset.exclude(pk__in=busy)
+
+    def _near(self, queryset):
+        data = self.form.cleaned_data
+
+        center = (data.get('lat'), data.get('lng'))
+        radius = data.get('radius_km')
+        bbox = data.get('bbox')
+
+        if radius is not None or any(value is not None for value in center):
+            if None in center or radius is None:
+                raise ValidationError({'radius_km': 'Для поиска по радиусу нужны lat, lng и radius_km'})
+            latitude, longitude, radius = float(center[0]), float(center[1]), float(radius)
+            if not 0 < radius <= self.MAX_RADIUS_KM:
+                raise ValidationError({'radius_km': f'Радиус должен быть больше 0 и не больше {self.MAX_RADIUS_KM} км'})
+            queryset = self._within_box(queryset, *radius_bbox(latitude, longitude, radius))
+            return self._annotate_distance(queryset, latitude, longitude).filter(distance__lte=radius)
+
+        if bbox:
+            min_lat, min_lng, max_lat, max_lng = self._parse_bbox(bbox)
+            queryset = self._within_box(queryset, min_lat, min_lng, max_lat, max_lng)
+            return self._annotate_distance(queryset, (min_lat + max_lat) / 2, (min_lng + max_lng) / 2)
+
+        return queryset
+
+    def filter_geo(self, queryset, name, value):
+        # Гео-параметры применяются вместе в filter_queryset
+        return queryset
+
+    @staticmethod
+    def _parse_bbox(value):
+        try:
+            min_lat, min_lng, max_lat, max_lng = (float(part) for part in value.split(','))
+        except ValueError:
+            raise ValidationError({'bbox': 'Ожидается bbox=min_lat,min_lng,max_lat,max_lng'})
+
+        if not (-90 <= min_lat < max_lat <= 90 and -180 <= min_lng < max_lng <= 180):
+            raise ValidationError({'bbox': 'Некорректные границы bbox'})
+
+        return min_lat, min_lng, max_lat, max_lng
+
+    @staticmethod
+    def _within_box(queryset, min_lat, min_lng, max_lat, max_lng):
+        cells = cover_cells(min_lat, min_lng, max_lat, max_lng)
+        queryset = queryset.filter(
+            latitude__gte=min_lat,
+            latitude__lte=max_lat,
+            longitude__gte=min_lng,
+            longitude__lte=max_lng
+        )
+        if not cells:
+            return queryset
+        return queryset.filter(reduce(or_, (_cell_range(cell) for cell in cells)))
+
+    @staticmethod
+    def _annotate_distance(queryset, latitude, longitude):
+        # Равнопромежуточная проекция: точности достаточно для радиусов до сотен километров
+        lat_km = (F('latitude') - Value(latitude)) * Value(KM_PER_DEGREE)
+        lng_km = (F('longitude') - Value(longitude)) * Value(KM_PER_DEGREE * math.cos(math.radians(latitude)))
+        return queryset.annotate(
+            distance=Sqrt(lat_km * lat_km + lng_km * lng_km, output_field=FloatField())
+        )
+
+    def filter_city(self, queryset, name, value):
+        cities = match_values(TrigramKind.CITY.name, value)
+        return queryset.filter(address_id__in=Address.objects.filter(city__in=cities).values('id'))
+
+    def filter_owner(self, queryset, name, value):
+        usernames = match_values(TrigramKind.USERNAME.name, value)
+        return queryset.filter(owner_id__in=User.objects.filter(username__in=usernames).values('id'))
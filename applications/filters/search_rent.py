@@ -0,0 +1,37 @@
+from rest_framework import filters
+
+from applications.search.index import parse_query, search
+
+
+class RentSearchFilter(filters.SearchFilter):
+    def filter_queryset(self, request, queryset, view):
+        query = ' '.join(self.get_search_terms(request))
+        query_terms = parse_query(query)
+
+        if not query_terms:
+            return queryset
+
+        return search(queryset, query_terms)
+
+
+class RentOrderingFilter(filters.OrderingFilter):
+    # Аннотации, которые добавляют фильтры, и порядок по умолчанию при их наличии
+    ranked_orderings = {
+        'distance': 'distance',
+        'search_rank': '-search_rank',
+    }
+
+    def get_ordering(self, request, queryset, view):
+        if not request.query_params.get(self.ordering_param):
+            for annotation, ordering in self.ranked_orderings.items():
+                if annotation in queryset.query.annotations:
+                    return [ordering]
+        return super().get_ordering(request, queryset, view)
+
+    def remove_invalid_fields(self, queryset, fields, view, request):
+        valid_fields = super().remove_invalid_fields(queryset, fields, view, request)
+        return [
+            term for term in valid_fields
+            if term.lstrip('-') not in self.ranked_orderings
+            or term.lstrip('-') in queryset.query.annotations
+        ]
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+
+
+def is_api_request(request) -> bool:
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+class SkipForAPIMixin:
+    """
+    Пропускает middleware для запросов к API: клиенты API входят по JWT-cookie
+    (JWTAuthenticationMiddleware), сессии, сообщения и request.user от Django им не нужны.
+    Админка и swagger проходят полный стек.
+    """
+
+    def __call__(self, request):
+        if is_api_request(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class WebSessionMiddleware(SkipForAPIMixin, SessionMiddleware):
+    pass
+
+
+class WebCsrfViewMiddleware(SkipForAPIMixin, CsrfViewMiddleware):
+    # process_view вызывается обработчиком напрямую, мимо __call__.
+    # Для API ничего не меняется: view DRF и так помечены csrf_exempt
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        if is_api_request(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class WebAuthenticationMiddleware(SkipForAPIMixin, AuthenticationMiddleware):
+    pass
+
+
+class WebMessageMiddleware(SkipForAPIMixin, MessageMiddleware):
+    pass
@@ -1,59 +1,55 @@
-import datetime
-
 from django.utils.deprecation import MiddlewareMixin
 
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 from rest_framework_simplejwt.exceptions import TokenError
 
+from applications.users.models.user import User
+from applications.users.revocation import in_reuse_grace, revoke, revoked_entry
+from applications.users.tokens import add_user_claims
+from applications.users.utils import set_token_cookie
+
 
 class JWTAuthenticationMiddleware(MiddlewareMixin):
+    """
+    Проверяет access-токен из cookie один раз за запрос и кладет его в request.jwt_access_token;
+    дальше его использует ClaimsJWTAuthentication без повторного декодирования.
+    Просроченный access-токен перевыпускается по refresh-токену; при ROTATE_REFRESH_TOKENS
+    refresh-токен при этом заменяется новым, а старый отзывается.
+    """
+
     def process_request(self, request):
         access_token = request.COOKIES.get('access_token')
         refresh_token = request.COOKIES.get('refresh_token')
 
         if access_token:
             try:
-                token = AccessToken(access_token)
-
-                if datetime.datetime.fromtimestamp(
-                    token['exp'], datetime.UTC
-                ) < datetime.datetime.now(tz=datetime.UTC):
-                    raise TokenError('Token expired')
-
-                request.META['HTTP_AUTHORIZATION'] = f"Bearer {access_token}"
+                # Конструктор проверяет подпись и exp
+                request.jwt_access_token = AccessToken(access_token)
+                return
             except TokenError:
-                new_access_token = self.refresh_access_token(refresh_token)
+                pass
 
-                if new_access_token:
-                    request.META['HTTP_AUTHORIZATION'] = f"Bearer {new_access_token}"
-
-                    request._new_access_token = new_access_token
-                else:
-                    self.clear_cookies(request)
-
-        elif refresh_token:
-            new_access_token = self.refresh_access_token(refresh_token)
+        if refresh_token:
+            new_access_token = self.refresh_access_token(request, refresh_token)
 
             if new_access_token:
-                request.META['HTTP_AUTHORIZATION'] = f"Bearer {new_access_token}"
+                request.jwt_access_token = new_access_token
                 request._new_access_token = new_access_token
-            else:
-                self.clear_cookies(request)
+                return
+
+        if access_token or refresh_token:
+            self.clear_cookies(request)
 
     def process_response(self, request, response):
+        # Cookie, которые view выставил или удалил сам (вход, выход), не перезаписываются
         new_access = getattr(request, '_new_access_token', None)
+        if new_access and 'access_token' not in response.cookies:
+            set_token_cookie(response, 'access_token', new_access)
 
-        if new_access:
-            access_exp = AccessToken(new_access)['exp']
-
-            response.set_cookie(
-                key='access_token',
-                value=new_access,
-                httponly=True,
-                secure=False,
-                samesite='Lax',
-                expires=datetime.datetime.fromtimestamp(access_exp, datetime.UTC)
-            )
+        new_refresh = getattr(request, '_new_refresh_token', None)
+        if new_refresh and 'refresh_token' not in response.cookies:
+            set_token_cookie(response, 'refresh_token', new_refresh)
 
         if getattr(request, '_clear_cookies', False):
             response.delete_cookie('access_token')
@@ -61,13 +57,39 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
 
         return response
 
-    def refresh_access_token(self, refresh_token):
+    def refresh_access_token(self, request, refresh_token):
         try:
             refresh = RefreshToken(refresh_token)
+        except TokenError:
+            return None
 
-            new_access_token = str(refresh.access_token)
-
-            return new_access_token
+        # Отозванный токен отклоняется; старый токен сразу после ротации еще принимается
+        # (параллельные запросы браузера), но второй раз не ротируется
+        revoked = revoked_entry(refresh)
+        if revoked is not None and not in_reuse_grace(revoked):
+            return None
 
-        except TokenError:
+        # Claims нового access-токена берутся из актуальной записи пользователя
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]},
+            is_active=True
+        ).first()
+        if user is None:
             return None
+
+        if api_settings.ROTATE_REFRESH_TOKENS and revoked is None:
+            if revoke(refresh, rotated=True):
+                refresh.set_jti()
+                refresh.set_exp()
+                refresh.set_iat()
+                request._new_refresh_token = add_user_claims(refresh, user)
+            else:
+                # Токен только что сменил параллельный запрос в другом воркере
+                revoked = revoked_entry(refresh)
+                if revoked is None or not in_reuse_grace(revoked):
+                    return None
+
+        return add_user_claims(refresh.access_token, user)
+
+    def clear_cookies(self, request):
+        request._clear_cookies = True
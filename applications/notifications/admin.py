@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from applications.notifications.models import OutboxMessage
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ['status', 'created_at']
+    search_fields = ('subject', 'to')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
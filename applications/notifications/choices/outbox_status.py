@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class OutboxStatus(str, Enum):
+    PENDING = 'Ожидает отправки'
+    SENT = 'Отправлено'
+    FAILED = 'Не доставлено'
+
+    @classmethod
+    def choices(cls):
+        return [(member.name, member.value) for member in cls]
@@ -0,0 +1,24 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from applications.notifications.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = 'Отправляет накопленные в outbox письма пачками через одно SMTP-соединение'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Работать постоянно, опрашивая outbox')
+        parser.add_argument('--interval', type=float, default=settings.OUTBOX_POLL_INTERVAL)
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain_outbox(batch_size=options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Отправлено: {sent}, с ошибкой: {failed}'))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1 @@
+from applications.notifications.models.outbox_message import OutboxMessage
@@ -0,0 +1,34 @@
+from django.db import models
+from django.utils import timezone
+
+from applications.notifications.choices.outbox_status import OutboxStatus
+
+
+class OutboxMessage(models.Model):
+    """Письмо, записанное в той же транзакции, что и изменение модели; отправляет воркер send_outbox."""
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField()
+    headers = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=OutboxStatus.choices(),
+        default=OutboxStatus.PENDING.name
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'outbox_message'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at', 'id'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {", ".join(self.to)}'
@@ -0,0 +1,139 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from applications.notifications.choices.outbox_status import OutboxStatus
+from applications.notifications.models import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+# Сколько взятое воркером письмо не выдается другим воркерам
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def _outbox_row(message: EmailMultiAlternatives) -> OutboxMessage:
+    html_body = next(
+        (content for content, mimetype in getattr(message, 'alternatives', []) if mimetype == 'text/html'),
+        ''
+    )
+    return OutboxMessage(
+        subject=message.subject,
+        body=message.body,
+        html_body=html_body,
+        from_email=message.from_email,
+        to=list(message.to),
+        headers=dict(message.extra_headers)
+    )
+
+
+def enqueue(message: EmailMultiAlternatives) -> OutboxMessage:
+    """Кладет письмо в outbox. Вызывать внутри транзакции, меняющей модель."""
+    row = _outbox_row(message)
+    row.save()
+    return row
+
+
+def enqueue_many(messages) -> list[OutboxMessage]:
+    return OutboxMessage.objects.bulk_create([_outbox_row(message) for message in messages])
+
+
+def to_email(row: OutboxMessage) -> EmailMultiAlternatives:
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email,
+        to=row.to,
+        headers=row.headers
+    )
+    if row.html_body:
+        message.attach_alternative(row.html_body, 'text/html')
+    return message
+
+
+def claim_batch(batch_size) -> list[OutboxMessage]:
+    now = timezone.now()
+    with transaction.atomic():
+        due = (
+            OutboxMessage.objects
+            .filter(status=OutboxStatus.PENDING.name, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+
+        batch = list(due[:batch_size])
+        if batch:
+            OutboxMessage.objects.filter(pk__in=[row.pk for row in batch]).update(next_attempt_at=now + CLAIM_LEASE)
+    return batch
+
+
+def _retry_delay(attempts) -> timedelta:
+    return timedelta(seconds=settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1))
+
+
+def _mark_failed(row, error):
+    row.attempts += 1
+    row.last_error = str(error)[:1000]
+    if row.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        row.status = OutboxStatus.FAILED.name
+    else:
+        row.next_attempt_at = timezone.now() + _retry_delay(row.attempts)
+    row.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def _mark_sent(row):
+    OutboxMessage.objects.filter(pk=row.pk).update(
+        status=OutboxStatus.SENT.name,
+        sent_at=timezone.now(),
+        attempts=F('attempts') + 1,
+        last_error=''
+    )
+
+
+def deliver(batch) -> tuple[int, int]:
+    """
+    Отправляет пачку писем через одно SMTP-соединение. Возвращает (отправлено, с ошибкой).
+    Письмо отмечается отправленным сразу после отправки, а ошибка любого письма
+    уходит в повторы и не обрывает пачку.
+    """
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception as exc:
+        for row in batch:
+            _mark_failed(row, exc)
+        return 0, len(batch)
+
+    sent = failed = 0
+    try:
+        for row in batch:
+            try:
+                mail_connection.send_messages([to_email(row)])
+            except Exception as exc:
+                logger.warning('Не удалось отправить письмо outbox #%s: %s', row.pk, exc)
+                _mark_failed(row, exc)
+                failed += 1
+            else:
+                _mark_sent(row)
+                sent += 1
+    finally:
+        mail_connection.close()
+
+    return sent, failed
+
+
+def drain_outbox(batch_size=None) -> tuple[int, int]:
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    sent = failed = 0
+    while True:
+        batch = claim_batch(batch_size)
+        if not batch:
+            return sent, failed
+        batch_sent, batch_failed = deliver(batch)
+        sent += batch_sent
+        failed += batch_failed
@@ -0,0 +1,81 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from applications.notifications.choices.outbox_status import OutboxStatus
+from applications.notifications.models import OutboxMessage
+from applications.notifications.outbox import enqueue, claim_batch, deliver, drain_outbox, CLAIM_LEASE
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_BACKOFF=60)
+class OutboxDeliveryTests(TestCase):
+
+    def setUp(self):
+        self.now = timezone.now()
+        patcher = mock.patch('applications.notifications.outbox.timezone.now', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def enqueue_to(self, address):
+        row = enqueue(EmailMultiAlternatives(subject='Тема', body='Текст', to=[address]))
+        # Письмо должно быть к отправке по подмененным часам
+        OutboxMessage.objects.filter(pk=row.pk).update(next_attempt_at=self.now)
+        return row
+
+    def travel(self, **delta):
+        self.now += timedelta(**delta)
+
+    def test_bad_row_does_not_stop_batch(self):
+        first = self.enqueue_to('first@example.com')
+        broken = self.enqueue_to('broken\n@example.com')
+        last = self.enqueue_to('last@example.com')
+
+        with self.assertLogs('applications.notifications.outbox', 'WARNING'):
+            self.assertEqual(deliver(claim_batch(10)), (2, 1))
+        self.assertEqual([message.to for message in mail.outbox], [['first@example.com'], ['last@example.com']])
+
+        for row in (first, last):
+            row.refresh_from_db()
+            self.assertEqual((row.status, row.attempts), (OutboxStatus.SENT.name, 1))
+        broken.refresh_from_db()
+        self.assertEqual((broken.status, broken.attempts), (OutboxStatus.PENDING.name, 1))
+        self.assertTrue(broken.last_error)
+
+    def test_backoff_doubles_until_failed(self):
+        row = self.enqueue_to('broken\n@example.com')
+
+        for attempt, delay in enumerate([60, 120], start=1):
+            with self.assertLogs('applications.notifications.outbox', 'WARNING'):
+                drain_outbox()
+            row.refresh_from_db()
+            self.assertEqual(row.attempts, attempt)
+            self.assertEqual(row.next_attempt_at, self.now + timedelta(seconds=delay))
+            # До окончания задержки письмо не выдается
+            self.travel(seconds=delay - 1)
+            self.assertEqual(claim_batch(10), [])
+            self.travel(seconds=1)
+
+        with self.assertLogs('applications.notifications.outbox', 'WARNING'):
+            drain_outbox()
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), (OutboxStatus.FAILED.name, 3))
+
+        self.travel(days=1)
+        self.assertEqual(claim_batch(10), [])
+
+    def test_claimed_rows_return_after_lease(self):
+        row = self.enqueue_to('guest@example.com')
+        self.assertEqual(claim_batch(10), [row])
+
+        # Воркер взял письмо и упал, не отправив его
+        self.assertEqual(claim_batch(10), [])
+        self.travel(seconds=CLAIM_LEASE.total_seconds())
+
+        self.assertEqual(drain_outbox(), (1, 0))
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutboxStatus.SENT.name)
+        self.assertEqual(len(mail.outbox), 1)
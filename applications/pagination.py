@@ -1,6 +1,141 @@
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+KeysetCursor = namedtuple('KeysetCursor', ['value', 'pk', 'reverse'])
 
 
 class CustomCursorPagination(CursorPagination):
+    """
+    Keyset-пагинация по составному ключу (поле сортировки, pk).
+
+    Курсор хранит значение активного поля сортировки и pk последней записи,
+    поэтому каждая страница — это диапазонный запрос по индексу (поле, pk)
+    без OFFSET, для любой сортировки из OrderingFilter.
+    """
     page_size = 5
+    page_size_query_param = 'page_size'
+    max_page_size = 50
     ordering = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.sort_field = self.ordering[0].lstrip('-')
+        if self.sort_field == 'id':
+            self.sort_field = 'pk'
+        self.descending = self.ordering[0].startswith('-')
+        self.model = queryset.model
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor.reverse if self.cursor else False
+
+        queryset = queryset.order_by(*self._order_by(reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(self._seek(self.cursor, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = self.cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        return self.page
+
+    def _descending(self, reverse):
+        return self.descending != reverse
+
+    def _order_by(self, reverse):
+        prefix = '-' if self._descending(reverse) else ''
+        if self.sort_field == 'pk':
+            return [f'{prefix}pk']
+        return [f'{prefix}{self.sort_field}', f'{prefix}pk']
+
+    def _seek(self, cursor, reverse):
+        lookup = 'lt' if self._descending(reverse) else 'gt'
+        if self.sort_field == 'pk':
+            return Q(**{f'pk__{lookup}': cursor.pk})
+        return (
+            Q(**{f'{self.sort_field}__{lookup}': cursor.value})
+            | Q(**{self.sort_field: cursor.value, f'pk__{lookup}': cursor.pk})
+        )
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return self.encode_cursor(self.cursor._replace(reverse=False))
+        return self.encode_cursor(self._cursor_for(self.page[-1], reverse=False))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.encode_cursor(self.cursor._replace(reverse=True))
+        return self.encode_cursor(self._cursor_for(self.page[0], reverse=True))
+
+    def _cursor_for(self, instance, reverse):
+        value = None
+        if self.sort_field != 'pk':
+            value = getattr(instance, self.sort_field)
+        return KeysetCursor(value=value, pk=instance.pk, reverse=reverse)
+
+    def encode_cursor(self, cursor):
+        payload = {'p': cursor.pk}
+        if cursor.value is not None:
+            payload['v'] = self._dump_value(cursor.value)
+        if cursor.reverse:
+            payload['r'] = 1
+
+        encoded = urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()).decode())
+            value = None
+            if self.sort_field != 'pk':
+                value = self._load_value(payload['v'])
+            pk = self.model._meta.pk.to_python(payload['p'])
+            return KeysetCursor(value=value, pk=pk, reverse=bool(payload.get('r')))
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _dump_value(value):
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def _load_value(self, raw):
+        try:
+            field = self.model._meta.get_field(self.sort_field)
+        except FieldDoesNotExist:
+            # Аннотации (search_rank, distance) — числовые
+            return float(raw)
+        return field.to_python(raw)
@@ -0,0 +1,73 @@
+import hashlib
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.utils.urls import replace_query_param
+
+GENERATION_KEY = 'rent_list:generation'
+
+# Выдача по датам зависит от броней, а они не меняют поколение кэша — такие запросы не кэшируются
+UNCACHED_PARAMS = ('check_in', 'check_out')
+
+
+def listing_generation() -> int:
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Новое поколение от текущего времени, чтобы не совпасть со старыми ключами после вытеснения
+        generation = int(time.time() * 1000)
+        cache.add(GENERATION_KEY, generation, None)
+        generation = cache.get(GENERATION_KEY, generation)
+    return generation
+
+
+def _bump_listing_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        listing_generation()
+
+
+def invalidate_listing_cache():
+    transaction.on_commit(_bump_listing_generation)
+
+
+def listing_cache_key(request) -> str | None:
+    if any(request.query_params.get(param) for param in UNCACHED_PARAMS):
+        return None
+
+    params = sorted(
+        (key, tuple(sorted(values)))
+        for key, values in request.query_params.lists()
+        if any(values)
+    )
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()
+    user = request.user
+    audience = f'user:{user.pk}' if user.is_authenticated else 'anon'
+    return f'rent_list:{listing_generation()}:{audience}:{digest}'
+
+
+def _cursor_token(link, cursor_param):
+    if link is None:
+        return None
+    return parse_qs(urlsplit(link).query).get(cursor_param, [None])[0]
+
+
+def cacheable_page(data, cursor_param):
+    """Страница без абсолютных ссылок: в кэше хранятся только курсоры next/previous."""
+    return {
+        **data,
+        'next': _cursor_token(data['next'], cursor_param),
+        'previous': _cursor_token(data['previous'], cursor_param),
+    }
+
+
+def page_for_request(data, request, cursor_param):
+    # Ссылки собираются от URL текущего запроса: хост и схема у разных клиентов свои
+    url = request.build_absolute_uri()
+    return {
+        **data,
+        'next': data['next'] and replace_query_param(url, cursor_param, data['next']),
+        'previous': data['previous'] and replace_query_param(url, cursor_param, data['previous']),
+    }
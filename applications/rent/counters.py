@@ -0,0 +1,113 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Case, When, Value, PositiveIntegerField
+
+from applications.rent.listing import refresh_listing_counters
+from applications.rent.models.rent import Rent
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500
+
+
+class ViewCounter:
+    """
+    Копит просмотры объявлений в памяти процесса и раз в
+    RENT_VIEWS_FLUSH_INTERVAL секунд записывает их в rent.cn_views пачкой.
+    Запись делает фоновый поток процесса, поэтому счетчики не залеживаются в тихом воркере;
+    при аварийном завершении процесса теряются просмотры не более чем за один интервал.
+    """
+
+    def __init__(self):
+        self._pending = Counter()
+        self._flushing = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher_pid = None
+
+    def hit(self, rent_id, viewer=None):
+        window = settings.RENT_VIEWS_DEDUP_WINDOW
+        if viewer is not None and window:
+            if not cache.add(f'rent_view:{rent_id}:{viewer}', 1, window):
+                return
+
+        self._ensure_flusher()
+        with self._lock:
+            self._pending[rent_id] += 1
+
+    def _ensure_flusher(self):
+        # Поток запускается в каждом процессе: после fork потоки родителя не наследуются
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+        threading.Thread(target=self._flush_periodically, name='rent-views-flush', daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(settings.RENT_VIEWS_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            finally:
+                # Соединение потока не должно висеть между сбросами
+                connection.close()
+
+    def pending(self, rent_id) -> int:
+        with self._lock:
+            return self._pending[rent_id] + self._flushing[rent_id]
+
+    def flush(self) -> int:
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+
+        try:
+            with self._lock:
+                self._flushing, self._pending = self._pending, Counter()
+                increments = dict(self._flushing)
+
+            if not increments:
+                return 0
+
+            try:
+                self._write(increments)
+            except Exception:
+                logger.exception('Не удалось записать просмотры объявлений')
+                with self._lock:
+                    self._pending.update(self._flushing)
+                return 0
+            finally:
+                with self._lock:
+                    self._flushing = Counter()
+
+            return sum(increments.values())
+        finally:
+            self._flush_lock.release()
+
+    def _write(self, increments):
+        rent_ids = list(increments)
+        for start in range(0, len(rent_ids), FLUSH_BATCH_SIZE):
+            batch = rent_ids[start:start + FLUSH_BATCH_SIZE]
+            Rent.objects.filter(pk__in=batch).update(
+                cn_views=F('cn_views') + Case(
+                    *[When(pk=rent_id, then=Value(increments[rent_id])) for rent_id in batch],
+                    default=Value(0),
+                    output_field=PositiveIntegerField()
+                )
+            )
+            # Только cn_views: просмотры не сбрасывают кэш списка, он догонит их по таймауту
+            refresh_listing_counters(batch, fields=('cn_views',), invalidate=False)
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.flush)
@@ -0,0 +1,89 @@
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+MAX_COVER_CELLS = 16
+KM_PER_DEGREE = 111.32
+
+
+def encode(latitude: float, longitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(geohash) < precision:
+        value, interval = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (interval[0] + interval[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(geohash)
+
+
+def next_prefix(cell: str) -> str | None:
+    """
+    Наименьшая строка geohash после всех строк с префиксом cell: последний символ
+    увеличивается по алфавиту с переносом. В алфавите только цифры и строчные буквы,
+    поэтому порядок одинаков для бинарного сравнения и для сортировок MySQL (utf8mb4_0900_ai_ci).
+    None — у ячейки из одних 'z' верхней границы нет.
+    """
+    prefix = cell.rstrip(BASE32[-1])
+    if not prefix:
+        return None
+    return prefix[:-1] + BASE32[BASE32.index(prefix[-1]) + 1]
+
+
+def cell_size(precision: int) -> tuple[float, float]:
+    lat_bits = 5 * precision // 2
+    lng_bits = 5 * precision - lat_bits
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def cover_cells(min_lat, min_lng, max_lat, max_lng) -> list[str]:
+    """
+    Ячейки geohash максимальной точности, покрывающие прямоугольник,
+    но не больше MAX_COVER_CELLS штук.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        lat_start = math.floor((min_lat + 90) / height)
+        lat_end = math.floor((max_lat + 90) / height)
+        lng_start = math.floor((min_lng + 180) / width)
+        lng_end = math.floor((max_lng + 180) / width)
+
+        if (lat_end - lat_start + 1) * (lng_end - lng_start + 1) > MAX_COVER_CELLS:
+            continue
+
+        cells = set()
+        for lat_index in range(lat_start, lat_end + 1):
+            for lng_index in range(lng_start, lng_end + 1):
+                latitude = min(-90 + (lat_index + 0.5) * height, 90.0)
+                longitude = min(-180 + (lng_index + 0.5) * width, 180.0)
+                cells.add(encode(latitude, longitude, precision))
+        return sorted(cells)
+
+    return []
+
+
+def radius_bbox(latitude, longitude, radius_km) -> tuple[float, float, float, float]:
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lng_delta, 180.0),
+    )
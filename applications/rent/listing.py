@@ -0,0 +1,113 @@
+from django.db.models import OuterRef, Subquery
+
+from applications.rent.cache import invalidate_listing_cache
+from applications.rent.models.listing import RentListing
+from applications.rent.models.rent import Rent
+
+# Поля Rent, которые копируются в карточку объявления как есть
+COPIED_FIELDS = (
+    'title',
+    'description',
+    'address_id',
+    'owner_id',
+    'price',
+    'rooms_count',
+    'room_type',
+    'avg_rating',
+    'cn_views',
+    'is_active',
+    'created_at',
+)
+
+COUNTER_FIELDS = ('avg_rating', 'cn_views')
+
+# Поля Address, которые копируются в карточку объявления
+ADDRESS_FIELDS = ('latitude', 'longitude', 'geohash')
+
+
+def listing_values(rent) -> dict:
+    values = {field: getattr(rent, field) for field in COPIED_FIELDS}
+    values['address_display'] = str(rent.address) if rent.address_id else None
+    for field in ADDRESS_FIELDS:
+        values[field] = getattr(rent.address, field) if rent.address_id else None
+    values['owner_display'] = str(rent.owner) if rent.owner_id else None
+    return values
+
+
+def _invalidate_if_changed(changed):
+    if changed:
+        invalidate_listing_cache()
+
+
+def sync_listing(rent, update_fields=None):
+    if rent.is_deleted:
+        deleted, _ = RentListing.objects.filter(pk=rent.pk).delete()
+        _invalidate_if_changed(deleted)
+        return
+
+    if update_fields is not None and set(update_fields) <= set(COUNTER_FIELDS):
+        _invalidate_if_changed(RentListing.objects.filter(pk=rent.pk).update(
+            **{field: getattr(rent, field) for field in update_fields}
+        ))
+        return
+
+    RentListing.objects.update_or_create(rent_id=rent.pk, defaults=listing_values(rent))
+    invalidate_listing_cache()
+
+
+def sync_address(address):
+    _invalidate_if_changed(
+        RentListing.objects.filter(address_id=address.pk).update(
+            address_display=str(address),
+            **{field: getattr(address, field) for field in ADDRESS_FIELDS}
+        )
+    )
+
+
+def detach_address(address_id):
+    _invalidate_if_changed(
+        RentListing.objects.filter(address_id=address_id).update(
+            address_id=None,
+            address_display=None,
+            **{field: None for field in ADDRESS_FIELDS}
+        )
+    )
+
+
+def sync_owner(user):
+    _invalidate_if_changed(
+        RentListing.objects.filter(owner_id=user.pk).update(owner_display=str(user))
+    )
+
+
+def detach_owner(user_id):
+    _invalidate_if_changed(
+        RentListing.objects.filter(owner_id=user_id).update(owner_id=None, owner_display=None)
+    )
+
+
+def refresh_listing_counters(rent_ids, fields=COUNTER_FIELDS, invalidate=True):
+    changed = RentListing.objects.filter(pk__in=rent_ids).update(**{
+        field: Subquery(Rent.objects.filter(pk=OuterRef('pk')).order_by().values(field)[:1])
+        for field in fields
+    })
+    if invalidate:
+        _invalidate_if_changed(changed)
+
+
+def rebuild_listings(chunk_size=500) -> int:
+    RentListing.objects.all().delete()
+
+    rebuilt = 0
+    batch = []
+    queryset = Rent.objects.select_related('address', 'owner').order_by('id')
+    for rent in queryset.iterator(chunk_size=chunk_size):
+        batch.append(RentListing(rent_id=rent.pk, **listing_values(rent)))
+        if len(batch) >= chunk_size:
+            RentListing.objects.bulk_create(batch)
+            rebuilt += len(batch)
+            batch = []
+
+    RentListing.objects.bulk_create(batch)
+    invalidate_listing_cache()
+    return rebuilt + len(batch)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from applications.rent.listing import rebuild_listings
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает таблицу карточек объявлений (rent_listing)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_listings(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Карточек объявлений: {rebuilt}'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0008_alter_rent_description'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='address',
+            name='city',
+            field=models.CharField(db_index=True, max_length=65),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_rent_listings(apps, schema_editor):
+    Rent = apps.get_model('rent', 'Rent')
+    RentListing = apps.get_model('rent', 'RentListing')
+
+    listings = []
+    for rent in Rent.objects.filter(is_deleted=False).select_related('address', 'owner').iterator(chunk_size=500):
+        address = rent.address
+        address_display = None
+        if address is not None:
+            parts = [address.country, address.city, address.street, address.house_number]
+            address_display = ', '.join(filter(None, parts))
+
+        listings.append(RentListing(
+            rent_id=rent.pk,
+            title=rent.title,
+            description=rent.description,
+            address_id=rent.address_id,
+            address_display=address_display,
+            owner_id=rent.owner_id,
+            owner_display=rent.owner.username if rent.owner_id else None,
+            price=rent.price,
+            rooms_count=rent.rooms_count,
+            room_type=rent.room_type,
+            avg_rating=rent.avg_rating,
+            cn_views=rent.cn_views,
+            is_active=rent.is_active,
+            created_at=rent.created_at,
+        ))
+
+    RentListing.objects.bulk_create(listings, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0009_alter_address_city'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentListing',
+            fields=[
+                ('rent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='rent.rent')),
+                ('title', models.CharField(max_length=90)),
+                ('description', models.TextField(max_length=500)),
+                ('address_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('address_display', models.CharField(blank=True, max_length=255, null=True)),
+                ('owner_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('owner_display', models.CharField(blank=True, max_length=45, null=True)),
+                ('price', models.DecimalField(db_index=True, decimal_places=2, max_digits=6)),
+                ('rooms_count', models.PositiveSmallIntegerField(default=0)),
+                ('room_type', models.CharField(choices=[('SINGLE_ROOM', 'Одна комната (студия)'), ('ONE_BEDROOM', 'Одна комната с отдельной спальней'), ('TWO_BEDROOM', 'Две комнаты с общей ванной'), ('TWO_BEDROOM_ENSUITE', 'Две комнаты с отдельными ванными'), ('THREE_BEDROOM', 'Три комнаты'), ('SUITE', 'Сьют / Апартаменты'), ('SHARED_ROOM', 'Общая комната / койко-место'), ('PRIVATE_ROOM_IN_SHARED', 'Отдельная комната в общей квартире'), ('LOFT', 'Лофт / Мансарда'), ('STUDIO', 'Студия'), ('HAUS', 'Дом')], max_length=36)),
+                ('avg_rating', models.FloatField(default=0.0)),
+                ('cn_views', models.PositiveIntegerField(default=0)),
+                ('is_active', models.BooleanField(db_index=True, default=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'rent_listing',
+                'ordering': ['-avg_rating'],
+            },
+        ),
+        migrations.RunPython(fill_rent_listings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:56
+
+from django.db import migrations, models
+from django.db.models import Sum, Count
+
+
+def fill_rating_totals(apps, schema_editor):
+    Rent = apps.get_model('rent', 'Rent')
+    Review = apps.get_model('reviews', 'Review')
+
+    totals = Review.objects.values('rent_id').annotate(total=Sum('rating'), count=Count('id')).order_by()
+    for row in totals.iterator():
+        Rent.objects.filter(pk=row['rent_id']).update(
+            rating_sum=row['total'],
+            rating_count=row['count'],
+            avg_rating=round(row['total'] / row['count'], 1)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0010_rentlisting'),
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rent',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rent',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rating_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0011_rent_rating_count_rent_rating_sum'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rentlisting',
+            index=models.Index(fields=['is_active', 'avg_rating', 'rent'], name='listing_rating_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentlisting',
+            index=models.Index(fields=['is_active', 'price', 'rent'], name='listing_price_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentlisting',
+            index=models.Index(fields=['is_active', 'created_at', 'rent'], name='listing_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentlisting',
+            index=models.Index(fields=['is_active', 'cn_views', 'rent'], name='listing_views_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:59
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0012_rentlisting_listing_rating_keyset_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddField(
+            model_name='rentlisting',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='rentlisting',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='rentlisting',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
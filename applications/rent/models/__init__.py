@@ -1,2 +1,3 @@
 from applications.rent.models.rent import Rent
 from applications.rent.models.locations import Address
+from applications.rent.models.listing import RentListing
@@ -0,0 +1,42 @@
+from django.db import models
+
+from applications.rent.choices.room_type import RoomType
+from applications.rent.models.rent import Rent
+
+
+class RentListing(models.Model):
+    rent = models.OneToOneField(
+        Rent,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='listing'
+    )
+    title = models.CharField(max_length=90)
+    description = models.TextField(max_length=500)
+    address_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    address_display = models.CharField(max_length=255, blank=True, null=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, null=True, blank=True, db_index=True)
+    owner_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    owner_display = models.CharField(max_length=45, blank=True, null=True)
+    price = models.DecimalField(max_digits=6, decimal_places=2, db_index=True)
+    rooms_count = models.PositiveSmallIntegerField(default=0)
+    room_type = models.CharField(max_length=36, choices=RoomType.choices())
+    avg_rating = models.FloatField(default=0.0)
+    cn_views = models.PositiveIntegerField(default=0)
+    is_active = models.BooleanField(default=True, db_index=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'rent_listing'
+        ordering = ['-avg_rating']
+        indexes = [
+            models.Index(fields=['is_active', 'avg_rating', 'rent'], name='listing_rating_keyset_idx'),
+            models.Index(fields=['is_active', 'price', 'rent'], name='listing_price_keyset_idx'),
+            models.Index(fields=['is_active', 'created_at', 'rent'], name='listing_created_keyset_idx'),
+            models.Index(fields=['is_active', 'cn_views', 'rent'], name='listing_views_keyset_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
@@ -1,15 +1,28 @@
+from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 
+from applications.rent.geo import encode
 from applications.users.models import User
 
 
 class Address(models.Model):
     country = models.CharField(max_length=64)
-    city = models.CharField(max_length=65)
+    city = models.CharField(max_length=65, db_index=True)
     street = models.CharField(max_length=128)
     house_number = models.CharField(max_length=16, blank=True, null=True)
     apartment_number = models.CharField(max_length=16, blank=True, null=True)
     postal_code = models.CharField(max_length=19, blank=True, null=True)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    geohash = models.CharField(max_length=12, null=True, blank=True, db_index=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -33,6 +46,13 @@ class Address(models.Model):
         related_name='addresses'
     )
 
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = encode(self.latitude, self.longitude)
+        else:
+            self.geohash = None
+        super().save(*args, **kwargs)
+
     def __str__(self):
         parts = [self.country, self.city, self.street, self.house_number]
         return ', '.join(filter(None, parts))
@@ -1,15 +1,16 @@
-from django.db import models
-from django.db.models import Avg, F
+from django.db import models, transaction
+from django.db.models import F, Case, When, Value, FloatField
+from django.db.models.functions import Cast, Round
 from django.utils import timezone
 
+from applications.dirty_fields import DirtyFieldsMixin
 from applications.rent.choices.room_type import RoomType
 from applications.rent.managers.rent import SoftDeleteManager
 from applications.rent.models.locations import Address
-from applications.reviews.models.review import Review
 from applications.users.models.user import User
 
 
-class Rent(models.Model):
+class Rent(DirtyFieldsMixin, models.Model):
     title = models.CharField(max_length=90, db_index=True)
     description = models.TextField(max_length=500)
     address = models.ForeignKey(
@@ -29,6 +30,8 @@ class Rent(models.Model):
     deleted_at = models.DateTimeField(null=True, blank=True)
 
     avg_rating = models.FloatField(default=0.0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
     cn_views = models.PositiveIntegerField(default=0)
 
     owner = models.ForeignKey(
@@ -40,21 +43,30 @@ class Rent(models.Model):
     )
 
     objects = SoftDeleteManager()
+    # Включая удаленные: счетчики и служебные обновления не должны их пропускать
+    all_objects = models.Manager()
 
     def delete(self, *arg, **kwargs):
         self.is_deleted = True
         self.deleted_at = timezone.now()
         self.save(update_fields=['is_deleted', 'deleted_at'])
 
-    def set_cn_views(self):
-        self.cn_views = F('cn_views') + 1
-        self.save(update_fields=['cn_views'])
-        self.refresh_from_db(fields=['cn_views'])
-
-    def set_avg_rating(self):
-        avg = Review.objects.filter(rent = self).aggregate(avg=Avg('rating'))['avg'] or 0.0
-        self.avg_rating = round(avg, 1)
-        self.save(update_fields=['avg_rating'])
+    @classmethod
+    def apply_rating_change(cls, rent_id, rating_delta, count_delta):
+        rents = cls.all_objects.filter(pk=rent_id)
+        with transaction.atomic():
+            # Два UPDATE: в MySQL присваивания в одном UPDATE видят уже измененные значения
+            rents.update(
+                rating_sum=F('rating_sum') + rating_delta,
+                rating_count=F('rating_count') + count_delta
+            )
+            rents.update(
+                avg_rating=Case(
+                    When(rating_count=0, then=Value(0.0)),
+                    default=Round(Cast('rating_sum', FloatField()) / F('rating_count'), 1),
+                    output_field=FloatField()
+                )
+            )
 
     class Meta:
         db_table = "rent"
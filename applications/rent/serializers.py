@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from applications.rent.models.rent import Rent
+from applications.rent.models.listing import RentListing
 from applications.rent.models.locations import Address
 
 
@@ -19,22 +20,28 @@ class AddressCreateSerializer(serializers.ModelSerializer):
             'street',
             'house_number',
             'apartment_number',
-            'postal_code'
+            'postal_code',
+            'latitude',
+            'longitude'
         ]
         extra_kwargs = {'house_number': {'required': False},
                         'apartment_number': {'required': False}}
 
 
-class RentListSerializer(serializers.ModelSerializer):
-    address = serializers.StringRelatedField(read_only=True)
-    owner = serializers.StringRelatedField(read_only=True)
+class RentListingSerializer(serializers.ModelSerializer):
+    address = serializers.CharField(source='address_display', read_only=True)
+    owner = serializers.CharField(source='owner_display', read_only=True)
+    distance = serializers.FloatField(read_only=True)
 
     class Meta:
-        model = Rent
+        model = RentListing
         fields = [
             'title',
             'description',
             'address',
+            'latitude',
+            'longitude',
+            'distance',
             'price',
             'rooms_count',
             'room_type',
@@ -43,6 +50,7 @@ class RentListSerializer(serializers.ModelSerializer):
             'owner'
         ]
 
+
 class RentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Rent
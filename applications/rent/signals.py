@@ -0,0 +1,35 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from applications.rent.listing import sync_listing, sync_address, detach_address, sync_owner, detach_owner
+from applications.rent.models.locations import Address
+from applications.rent.models.rent import Rent
+from applications.users.models.user import User
+
+
+@receiver(post_save, sender=Rent)
+def update_rent_listing(sender, instance, update_fields=None, **kwargs):
+    sync_listing(instance, update_fields)
+
+
+@receiver(post_save, sender=Address)
+def update_listing_address(sender, instance, created, **kwargs):
+    if not created:
+        sync_address(instance)
+
+
+@receiver(post_delete, sender=Address)
+def clear_listing_address(sender, instance, **kwargs):
+    detach_address(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def update_listing_owner(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    sync_owner(instance)
+
+
+@receiver(post_delete, sender=User)
+def clear_listing_owner(sender, instance, **kwargs):
+    detach_owner(instance.pk)
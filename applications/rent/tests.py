@@ -1,3 +1,292 @@
-from django.test import TestCase
+import datetime
+import threading
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from applications.bookings.choices.waiting_status import WaitingStatus
+from applications.bookings.models import Booking
+from applications.factories import make_user, make_address, make_rent
+from applications.rent.cache import listing_generation
+from applications.rent.counters import ViewCounter, view_counter
+from applications.rent.geo import next_prefix
+from applications.rent.models import Rent
+from applications.rent.models.listing import RentListing
+from applications.reviews.models.review import Review
+
+
+class RentListFixtureMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user('owner', 'LESSOR')
+        self.lessee = make_user('lessee', 'LESSEE')
+        self.address = make_address()
+        self.rents = [make_rent(self.owner, f'Квартира {i}', self.address, price=50 + i) for i in range(3)]
+
+    def titles(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.data['results']]
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class RentListCacheTests(RentListFixtureMixin, APITestCase):
+
+    def test_cached_page_links_follow_request_host(self):
+        first = self.client.get('/api/v1/rent/', {'page_size': 1}, HTTP_HOST='a.example.com')
+        self.assertTrue(first.data['next'].startswith('http://a.example.com/api/v1/rent/'))
+
+        cached = self.client.get('/api/v1/rent/', {'page_size': 1}, HTTP_HOST='b.example.com')
+
+        self.assertEqual(self.titles(cached), self.titles(first))
+        self.assertTrue(cached.data['next'].startswith('http://b.example.com/api/v1/rent/'))
+        self.assertEqual(cached.data['next'].split('?', 1)[1], first.data['next'].split('?', 1)[1])
+
+    def test_date_search_sees_new_confirmed_booking(self):
+        check_in = datetime.date.today() + datetime.timedelta(days=10)
+        params = {'check_in': check_in, 'check_out': check_in + datetime.timedelta(days=3)}
+        self.assertEqual(len(self.titles(self.client.get('/api/v1/rent/', params))), 3)
+
+        Booking.objects.create(
+            lessee=self.lessee,
+            rent=self.rents[0],
+            start_date=check_in,
+            end_date=check_in + datetime.timedelta(days=2),
+            status=WaitingStatus.CONFIRMED.name
+        )
+
+        titles = self.titles(self.client.get('/api/v1/rent/', params))
+        self.assertNotIn(self.rents[0].title, titles)
+
+    def test_rent_change_invalidates_cached_list(self):
+        self.assertEqual(len(self.titles(self.client.get('/api/v1/rent/'))), 3)
+
+        # Поколение кэша меняется после коммита
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rents[0].is_active = False
+            self.rents[0].save()
+
+        self.assertEqual(len(self.titles(self.client.get('/api/v1/rent/'))), 2)
+
+
+@override_settings(
+    RENT_VIEWS_DEDUP_WINDOW=60,
+    REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+)
+class RentViewCounterTests(RentListFixtureMixin, APITestCase):
+
+    def setUp(self):
+        # Просмотры прошлых тестов копятся в счетчике процесса; id объявлений переиспользуются
+        view_counter.flush()
+        super().setUp()
+        self.rent = self.rents[0]
+
+    def view(self, client_ip):
+        # nginx передает адрес клиента в X-Forwarded-For, REMOTE_ADDR у всех один
+        response = self.client.get(
+            f'/api/v1/rent/{self.rent.pk}/', HTTP_X_FORWARDED_FOR=client_ip, REMOTE_ADDR='172.18.0.2'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_anonymous_viewers_behind_proxy_counted_separately(self):
+        self.view('203.0.113.1')
+        self.view('203.0.113.2')
+        self.view('203.0.113.1')
+
+        self.assertEqual(view_counter.pending(self.rent.pk), 2)
+
+    def test_flush_updates_listing_without_invalidating_list_cache(self):
+        self.view('203.0.113.1')
+        generation = listing_generation()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(view_counter.flush(), 1)
+
+        self.assertEqual(RentListing.objects.get(pk=self.rent.pk).cn_views, 1)
+        self.assertEqual(listing_generation(), generation)
+
+    @override_settings(RENT_VIEWS_FLUSH_INTERVAL=0.01)
+    def test_pending_views_flushed_without_further_hits(self):
+        counter = ViewCounter()
+        written = threading.Event()
+        increments = []
+
+        def write(batch):
+            increments.append(batch)
+            written.set()
+
+        with mock.patch.object(counter, '_write', side_effect=write):
+            counter.hit(self.rent.pk)
+            self.assertTrue(written.wait(timeout=5))
+
+        self.assertEqual(increments, [{self.rent.pk: 1}])
+        self.assertEqual(counter.pending(self.rent.pk), 0)
+
+
+class DirtyFieldsTests(RentListFixtureMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rent = Rent.objects.get(pk=self.rents[0].pk)
+
+    def test_noop_save_skips_query_and_signals(self):
+        receiver = mock.Mock()
+        post_save.connect(receiver, sender=Rent)
+        self.addCleanup(post_save.disconnect, receiver, sender=Rent)
+        updated_at = self.rent.updated_at
+
+        with self.assertNumQueries(0):
+            self.rent.save()
+
+        receiver.assert_not_called()
+        self.assertEqual(Rent.objects.get(pk=self.rent.pk).updated_at, updated_at)
+
+    def test_explicit_update_fields_always_saves(self):
+        receiver = mock.Mock()
+        post_save.connect(receiver, sender=Rent)
+        self.addCleanup(post_save.disconnect, receiver, sender=Rent)
+
+        self.rent.save(update_fields=['title'])
+
+        receiver.assert_called_once()
+
+    def test_save_writes_only_changed_fields(self):
+        self.rent.price = 99
+
+        with CaptureQueriesContext(connection) as queries:
+            self.rent.save()
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "rent"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"price"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"title"', updates[0])
+        self.assertEqual(Rent.objects.get(pk=self.rent.pk).price, 99)
+
+    def test_receivers_see_previous_values(self):
+        seen = []
+
+        def receiver(instance, **kwargs):
+            seen.append((instance.has_changed('price'), instance.previous('price'), instance.price))
+
+        post_save.connect(receiver, sender=Rent)
+        self.addCleanup(post_save.disconnect, receiver, sender=Rent)
+        old_price = self.rent.price
+
+        self.rent.price = 99
+        self.rent.save()
+        self.rent.save()
+
+        self.assertEqual(seen, [(True, old_price, 99)])
+        self.assertFalse(self.rent.has_changed('price'))
+
+
+class RentListingSyncTests(RentListFixtureMixin, APITestCase):
+
+    def listing(self, rent):
+        return RentListing.objects.get(pk=rent.pk)
+
+    def test_rent_changes_reach_listing(self):
+        rent = self.rents[0]
+        listing = self.listing(rent)
+        self.assertEqual(
+            (listing.title, listing.price, listing.address_display, listing.owner_display),
+            (rent.title, rent.price, 'DE, Berlin, Main', 'owner')
+        )
+
+        rent.title = 'Лофт'
+        rent.price = 75
+        rent.save()
+        listing = self.listing(rent)
+        self.assertEqual((listing.title, listing.price), ('Лофт', 75))
+
+        rent.delete()
+        self.assertFalse(RentListing.objects.filter(pk=rent.pk).exists())
+
+    def test_address_and_owner_changes_reach_listing(self):
+        self.address.street = 'Side'
+        self.address.latitude, self.address.longitude = 52.52, 13.40
+        self.address.save()
+        self.owner.username = 'landlord'
+        self.owner.save()
+
+        listings = RentListing.objects.filter(pk__in=[rent.pk for rent in self.rents])
+        self.assertEqual(
+            set(listings.values_list('address_display', 'latitude', 'owner_display')),
+            {('DE, Berlin, Side', 52.52, 'landlord')}
+        )
+
+        self.address.delete()
+        self.owner.delete()
+        self.assertEqual(
+            set(listings.values_list('address_id', 'address_display', 'geohash', 'owner_id', 'owner_display')),
+            {(None, None, None, None, None)}
+        )
+
+    def test_rating_reaches_listing(self):
+        Review.objects.create(reviewer=self.lessee, rent=self.rents[0], rating=4)
+        self.assertEqual(self.listing(self.rents[0]).avg_rating, 4.0)
+
+    def test_inactive_listing_visible_to_owner_only(self):
+        rent = self.rents[0]
+        rent.is_active = False
+        rent.save()
+        self.assertFalse(self.listing(rent).is_active)
+
+        self.assertNotIn(rent.title, self.titles(self.client.get('/api/v1/rent/')))
+        self.client.force_authenticate(self.lessee)
+        self.assertNotIn(rent.title, self.titles(self.client.get('/api/v1/rent/')))
+        self.client.force_authenticate(self.owner)
+        self.assertIn(rent.title, self.titles(self.client.get('/api/v1/rent/')))
+
+
+class GeoSearchTests(RentListFixtureMixin, APITestCase):
+    PLACES = {
+        'Митте': (52.5200, 13.4050),
+        'Кройцберг': (52.4986, 13.4030),
+        'Потсдам': (52.3906, 13.0645),
+        'Гамбург': (53.5511, 9.9937),
+    }
+
+    def setUp(self):
+        super().setUp()
+        for title, (latitude, longitude) in self.PLACES.items():
+            address = make_address(street=title, latitude=latitude, longitude=longitude)
+            make_rent(self.owner, title, address)
+
+    def test_next_prefix(self):
+        self.assertEqual(next_prefix('u33d'), 'u33e')
+        self.assertEqual(next_prefix('u339'), 'u33b')
+        self.assertEqual(next_prefix('u33z'), 'u34')
+        self.assertIsNone(next_prefix('zz'))
+
+    def test_radius_orders_by_distance(self):
+        center = {'lat': 52.52, 'lng': 13.405}
+
+        self.assertEqual(self.titles(self.client.get('/api/v1/rent/', {**center, 'radius_km': 5})),
+                         ['Митте', 'Кройцберг'])
+        self.assertEqual(self.titles(self.client.get('/api/v1/rent/', {**center, 'radius_km': 30})),
+                         ['Митте', 'Кройцберг', 'Потсдам'])
+
+    def test_bbox(self):
+        response = self.client.get('/api/v1/rent/', {'bbox': '52.3,13.0,52.6,13.5', 'ordering': 'price'})
+        self.assertCountEqual(self.titles(response), ['Митте', 'Кройцберг', 'Потсдам'])
+
+        response = self.client.get('/api/v1/rent/', {'bbox': '53,9,54,10'})
+        self.assertEqual(self.titles(response), ['Гамбург'])
+
+    def test_cursor_pages_over_distance(self):
+        params = {'lat': 52.52, 'lng': 13.405, 'radius_km': 300, 'page_size': 1}
+        response = self.client.get('/api/v1/rent/', params)
+        titles = self.titles(response)
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            titles += self.titles(response)
+
+        self.assertEqual(titles, ['Митте', 'Кройцберг', 'Потсдам', 'Гамбург'])
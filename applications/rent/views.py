@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q, Subquery, OuterRef
 from django_filters.rest_framework import DjangoFilterBackend
 
@@ -8,13 +10,18 @@ from rest_framework.generics import (ListCreateAPIView,
                                      get_object_or_404)
 from rest_framework.permissions import SAFE_METHODS, AllowAny
 from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
 from rest_framework.views import APIView
 
 from applications.filters.filter_rent import RentFilter
+from applications.filters.search_rent import RentSearchFilter, RentOrderingFilter
 from applications.permissions.permissions import IsOwnerOrReadOnly
+from applications.rent.cache import listing_cache_key, cacheable_page, page_for_request
+from applications.rent.counters import view_counter
+from applications.rent.models.listing import RentListing
 from applications.rent.models.locations import Address
 from applications.rent.models.rent import Rent
-from applications.rent.serializers import (RentListSerializer,
+from applications.rent.serializers import (RentListingSerializer,
                                            RentCreateSerializer,
                                            RentSwitchActiveSerializer,
                                            RentDetailSerializer,
@@ -52,23 +59,38 @@ class RentListCreateGenericAPIView(ListCreateAPIView):
     ordering = ['-avg_rating']
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter
+        RentSearchFilter,
+        RentOrderingFilter
     ]
 
     filterset_class = RentFilter
-    search_fields = ['title', 'description']
-    ordering_fields = ['price', 'created_at', 'avg_rating', 'cn_views']
+    ordering_fields = ['price', 'created_at', 'avg_rating', 'cn_views', 'search_rank', 'distance']
 
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
-            return RentListSerializer
+            return RentListingSerializer
         return RentCreateSerializer
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Rent.objects.select_related('address', 'owner').filter(Q(owner=user) | Q(is_active=True))
-        return queryset
+        if not user.is_authenticated:
+            return RentListing.objects.filter(is_active=True)
+        return RentListing.objects.filter(Q(owner_id=user.pk) | Q(is_active=True))
+
+    def list(self, request, *args, **kwargs):
+        cache_key = listing_cache_key(request)
+        if cache_key is None:
+            return super().list(request, *args, **kwargs)
+
+        cursor_param = self.paginator.cursor_query_param
+        data = cache.get(cache_key)
+
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            cache.set(cache_key, cacheable_page(response.data, cursor_param), settings.RENT_LIST_CACHE_TIMEOUT)
+            return response
+
+        return Response(page_for_request(data, request, cursor_param))
 
     def perform_create(self, serializer):
         title = serializer.validated_data.get('title')
@@ -115,9 +137,17 @@ class RentDetailUpdateDeleteGenericAPIView(RetrieveUpdateDestroyAPIView):
             raise PermissionDenied("Объявление не доступно")
         return obj
 
+    def get_viewer_key(self):
+        user = self.request.user
+        if user.is_authenticated:
+            return f'user:{user.pk}'
+        # IP клиента определяется как в throttling: за nginx — по X-Forwarded-For (NUM_PROXIES)
+        return f'ip:{BaseThrottle().get_ident(self.request)}'
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        instance.set_cn_views()
+        view_counter.hit(instance.pk, viewer=self.get_viewer_key())
+        instance.cn_views += view_counter.pending(instance.pk)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
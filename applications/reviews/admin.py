@@ -70,8 +70,4 @@ class ReviewAdmin(admin.ModelAdmin):
     short_comment.short_description = _('Комментарий')
 
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('reviewer', 'rent')
-
-    def save_model(self, request, obj, form, change):
-        super().save_model(request, obj, form, change)
-        obj.rent.set_avg_rating()
\ No newline at end of file
+        return super().get_queryset(request).select_related('reviewer', 'rent')
\ No newline at end of file
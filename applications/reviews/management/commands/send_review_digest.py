@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from applications.reviews.notifications import send_review_digests
+
+
+class Command(BaseCommand):
+    help = 'Кладет в outbox сводки новых отзывов для владельцев (запускать по расписанию)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-hours', type=int, default=settings.REVIEW_DIGEST_WINDOW_HOURS)
+
+    def handle(self, *args, **options):
+        owners, reviews = send_review_digests(window=timedelta(hours=options['window_hours']))
+        self.stdout.write(self.style.SUCCESS(f'Сводок: {owners}, отзывов в них: {reviews}'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rent', '0012_rentlisting_listing_rating_keyset_idx_and_more'),
+        ('reviews', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['rent', 'created_at', 'id'], name='review_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['rent', 'rating', 'id'], name='review_rating_keyset_idx'),
+        ),
+    ]
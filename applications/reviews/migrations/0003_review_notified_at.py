@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:25
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_notified(apps, schema_editor):
+    # Об уже существующих отзывах владельцам сообщили сразу при создании
+    Review = apps.get_model('reviews', 'Review')
+    Review.objects.update(notified_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_review_review_created_keyset_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(mark_existing_notified, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['notified_at', 'created_at'], name='review_digest_idx'),
+        ),
+    ]
@@ -1,12 +1,11 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
-from django.utils import timezone
+from django.db import models, transaction
 
+from applications.dirty_fields import DirtyFieldsMixin
 from applications.users.models import User
 
 
-
-class Review(models.Model):
+class Review(DirtyFieldsMixin, models.Model):
     reviewer = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -26,6 +25,8 @@ class Review(models.Model):
 
     comment = models.TextField(max_length=500, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Когда владелец узнал об отзыве; пусто — отзыв ждет сводки
+    notified_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         db_table = 'review'
@@ -40,6 +41,19 @@ class Review(models.Model):
                 name='one_review_per_rent_per_user'
             )
         ]
+        indexes = [
+            models.Index(fields=['rent', 'created_at', 'id'], name='review_created_keyset_idx'),
+            models.Index(fields=['rent', 'rating', 'id'], name='review_rating_keyset_idx'),
+            models.Index(fields=['notified_at', 'created_at'], name='review_digest_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
 
     def __str__(self):
         return f'{self.reviewer} → {self.rent}: {self.rating}'
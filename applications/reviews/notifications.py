@@ -0,0 +1,95 @@
+import logging
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from applications.notifications.outbox import enqueue_many
+from applications.reviews.models.review import Review
+
+logger = logging.getLogger(__name__)
+
+SENDER = "HomeRentEasy@net.net"
+
+
+def _message(subject, template_name, context, recipient) -> EmailMultiAlternatives:
+    msg = EmailMultiAlternatives(
+        subject=subject,
+        body=render_to_string(template_name=f'{template_name}.txt', context=context),
+        from_email=SENDER,
+        to=[recipient],
+        headers={'List-Unsubscribe': '<mailto:unsub@example.com>'}
+    )
+    msg.attach_alternative(render_to_string(template_name=f'{template_name}.html', context=context), 'text/html')
+    return msg
+
+
+def build_review_message(review) -> EmailMultiAlternatives:
+    context = {
+        "review": review,
+        "rent": review.rent,
+    }
+    return _message("Новый отзыв на ваше объявление", 'new_review', context, review.rent.owner.email)
+
+
+def build_digest_message(owner, reviews) -> EmailMultiAlternatives:
+    rents = [
+        {'rent': rent, 'reviews': list(rent_reviews)}
+        for rent, rent_reviews in groupby(reviews, key=lambda review: review.rent)
+    ]
+    context = {
+        "owner": owner,
+        "rents": rents,
+        "reviews_count": len(reviews),
+    }
+    return _message(f"Новые отзывы на ваши объявления: {len(reviews)}", 'new_review_digest', context, owner.email)
+
+
+def send_review_digests(window=None) -> tuple[int, int]:
+    """
+    Собирает отзывы, о которых владельцы еще не знают, одним запросом и кладет в outbox
+    по одной сводке на владельца. Владелец получает сводку, когда его самому старому
+    ожидающему отзыву исполнилось window. Возвращает (владельцев, отзывов).
+    """
+    window = window or timedelta(hours=settings.REVIEW_DIGEST_WINDOW_HOURS)
+    now = timezone.now()
+
+    pending = (
+        Review.objects
+        .filter(notified_at__isnull=True, created_at__lte=now)
+        .select_related('rent__owner', 'reviewer')
+        .order_by('rent__owner_id', 'rent_id', 'created_at')
+    )
+
+    messages = []
+    notified_ids = []
+    # Отзывы на объявления без владельца: сообщать некому, но отметить, чтобы не перебирать снова
+    ownerless_ids = []
+    for owner, owner_reviews in groupby(pending, key=lambda review: review.rent.owner):
+        owner_reviews = list(owner_reviews)
+        if owner is None:
+            ownerless_ids.extend(review.pk for review in owner_reviews)
+            continue
+        if min(review.created_at for review in owner_reviews) > now - window:
+            continue
+        try:
+            messages.append(build_digest_message(owner, owner_reviews))
+        except Exception:
+            # Сводка одного владельца не должна останавливать остальные; его отзывы дождутся следующего запуска
+            logger.exception('Не удалось собрать сводку отзывов для владельца #%s', owner.pk)
+            continue
+        notified_ids.extend(review.pk for review in owner_reviews)
+
+    if not messages and not ownerless_ids:
+        return 0, 0
+
+    with transaction.atomic():
+        enqueue_many(messages)
+        # Только отзывы, попавшие в положенные в outbox сводки
+        Review.objects.filter(pk__in=[*notified_ids, *ownerless_ids]).update(notified_at=now)
+
+    return len(messages), len(notified_ids)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from applications.rent.models.rent import Rent
 from applications.reviews.models.review import Review
 
 
@@ -13,6 +14,9 @@ class ReviewListSerializer(serializers.ModelSerializer):
 
 
 class ReviewCreateSerializer(serializers.ModelSerializer):
+    # Владелец нужен письму о новом отзыве: грузим его сразу
+    rent = serializers.PrimaryKeyRelatedField(queryset=Rent.objects.select_related('owner'))
+
     class Meta:
         model = Review
         fields = [
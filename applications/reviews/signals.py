@@ -1,44 +1,51 @@
-from django.core.mail import EmailMultiAlternatives
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.template.loader import render_to_string
+from django.utils import timezone
 
+from applications.notifications.outbox import enqueue
+from applications.rent.listing import refresh_listing_counters
+from applications.rent.models.rent import Rent
 from applications.reviews.models.review import Review
+from applications.reviews.notifications import build_review_message
 
 
-@receiver([post_save, post_delete], sender=Review)
-def update_rating(sender, instance, **kwargs):
-    instance.rent.set_avg_rating()
+@receiver(post_save, sender=Review)
+def update_rating(sender, instance, created, **kwargs):
+    if created:
+        Rent.apply_rating_change(instance.rent_id, instance.rating, 1)
+        rent_ids = [instance.rent_id]
+    elif instance.has_changed('rent'):
+        # Отзыв перенесли на другое объявление (админка): оценка уходит со старого целиком
+        old_rent_id = instance.previous('rent')
+        Rent.apply_rating_change(old_rent_id, -instance.previous('rating'), -1)
+        Rent.apply_rating_change(instance.rent_id, instance.rating, 1)
+        rent_ids = [old_rent_id, instance.rent_id]
+    elif instance.has_changed('rating'):
+        Rent.apply_rating_change(instance.rent_id, instance.rating - instance.previous('rating'), 0)
+        rent_ids = [instance.rent_id]
+    else:
+        return
+    refresh_listing_counters(rent_ids)
+
+
+@receiver(post_delete, sender=Review)
+def remove_rating(sender, instance, **kwargs):
+    Rent.apply_rating_change(instance.rent_id, -instance.rating, -1)
+    refresh_listing_counters([instance.rent_id])
+
 
 @receiver(post_save, sender=Review)
 def notify_new_review(sender, instance, created, **kwargs):
-    if created:
-        subject = "Новый отзыв на ваше объявление"
-        sender = "HomeRentEasy@net.net"
-        recipient = instance.rent.owner.email
-
-        context = {
-            "review": instance,
-            "rent": instance.rent,
-        }
-
-        text_content = render_to_string(
-            template_name='new_review.txt',
-            context=context
-        )
-
-        html_content = render_to_string(
-            template_name='new_review.html',
-            context=context
-        )
-
-        msg = EmailMultiAlternatives(
-            subject=subject,
-            body=text_content,
-            from_email=sender,
-            to=[recipient],
-            headers={'List-Unsubscribe': '<mailto:unsub@example.com>'}
-        )
-
-        msg.attach_alternative(html_content, 'text/html')
-        msg.send()
\ No newline at end of file
+    if not created:
+        return
+    owner = instance.rent.owner
+    if owner is not None and owner.review_digest:
+        # Отзыв попадет в сводку send_review_digest
+        return
+
+    # У объявления без владельца сообщать некому: отзыв все равно отмечается,
+    # иначе каждая сводка перебирала бы его снова
+    if owner is not None:
+        enqueue(build_review_message(instance))
+    instance.notified_at = timezone.now()
+    Review.objects.filter(pk=instance.pk).update(notified_at=instance.notified_at)
@@ -1,3 +1,132 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from applications.factories import make_user, make_address, make_rent
+from applications.notifications.models import OutboxMessage
+from applications.rent.models import Rent
+from applications.reviews import notifications
+from applications.reviews.models.review import Review
+from applications.reviews.notifications import send_review_digests
+
+
+class RatingCountersTests(TestCase):
+
+    def setUp(self):
+        self.owner = make_user('owner', 'LESSOR')
+        self.lessees = [make_user(f'lessee{i}', 'LESSEE') for i in range(2)]
+        address = make_address()
+        self.first, self.second = [make_rent(self.owner, f'Квартира {i}', address) for i in range(2)]
+
+    def assertRating(self, rent, rating_sum, rating_count, avg_rating):
+        rent = Rent.all_objects.get(pk=rent.pk)
+        self.assertEqual((rent.rating_sum, rent.rating_count, rent.avg_rating),
+                         (rating_sum, rating_count, avg_rating))
+
+    def test_rating_change_adjusts_counters(self):
+        review = Review.objects.create(reviewer=self.lessees[0], rent=self.first, rating=4)
+        Review.objects.create(reviewer=self.lessees[1], rent=self.first, rating=5)
+        self.assertRating(self.first, 9, 2, 4.5)
+
+        review.rating = 2
+        review.save()
+        self.assertRating(self.first, 7, 2, 3.5)
+
+        review.delete()
+        self.assertRating(self.first, 5, 1, 5.0)
+
+    def test_review_moved_to_another_rent(self):
+        review = Review.objects.create(reviewer=self.lessees[0], rent=self.first, rating=4)
+        Review.objects.create(reviewer=self.lessees[1], rent=self.first, rating=2)
+
+        review = Review.objects.get(pk=review.pk)
+        review.rent = self.second
+        review.rating = 5
+        review.save()
+
+        self.assertRating(self.first, 2, 1, 2.0)
+        self.assertRating(self.second, 5, 1, 5.0)
+
+    def test_counters_follow_reviews_of_deleted_rent(self):
+        review = Review.objects.create(reviewer=self.lessees[0], rent=self.first, rating=4)
+        self.first.delete()
+
+        review.rating = 3
+        review.save()
+        self.assertRating(self.first, 3, 1, 3.0)
+
+        review.delete()
+        self.assertRating(self.first, 0, 0, 0.0)
+
+
+class ReviewNotificationTests(TestCase):
+
+    def setUp(self):
+        self.lessees = [make_user(f'lessee{i}', 'LESSEE') for i in range(2)]
+        self.address = make_address()
+
+    def make_rent(self, owner):
+        return make_rent(owner, f'Квартира {owner}', self.address)
+
+    def review_waited(self, rent, lessee, **delta):
+        review = Review.objects.create(reviewer=lessee, rent=rent, rating=4)
+        Review.objects.filter(pk=review.pk).update(created_at=timezone.now() - timedelta(**delta))
+        return review
+
+    def recipients(self):
+        return sorted(address for row in OutboxMessage.objects.all() for address in row.to)
+
+    def test_owner_without_digest_is_notified_at_once(self):
+        rent = self.make_rent(make_user('owner', 'LESSOR'))
+        review = Review.objects.create(reviewer=self.lessees[0], rent=rent, rating=5)
+
+        self.assertEqual(self.recipients(), ['owner@example.com'])
+        review.refresh_from_db()
+        self.assertIsNotNone(review.notified_at)
+        self.assertEqual(send_review_digests(), (0, 0))
+
+    def test_digest_waits_for_window(self):
+        rent = self.make_rent(make_user('owner', 'LESSOR', review_digest=True))
+        self.review_waited(rent, self.lessees[0], hours=1)
+        self.assertEqual(send_review_digests(), (0, 0))
+
+        self.review_waited(rent, self.lessees[1], days=2)
+        self.assertEqual(send_review_digests(), (1, 2))
+        self.assertEqual(self.recipients(), ['owner@example.com'])
+        self.assertFalse(Review.objects.filter(notified_at__isnull=True).exists())
+
+    def test_reviews_of_ownerless_rent_are_marked(self):
+        owner = make_user('owner', 'LESSOR', review_digest=True)
+        rent = self.make_rent(owner)
+        waiting = self.review_waited(rent, self.lessees[0], days=2)
+        owner.delete()
+        rent.refresh_from_db()
+        created = Review.objects.create(reviewer=self.lessees[1], rent=rent, rating=3)
+
+        self.assertEqual(send_review_digests(), (0, 0))
+        self.assertEqual(self.recipients(), [])
+        for review in (waiting, created):
+            review.refresh_from_db()
+            self.assertIsNotNone(review.notified_at)
+
+    def test_failed_digest_keeps_reviews_pending(self):
+        broken = self.make_rent(make_user('broken', 'LESSOR', review_digest=True))
+        healthy = self.make_rent(make_user('healthy', 'LESSOR', review_digest=True))
+        stuck = self.review_waited(broken, self.lessees[0], days=2)
+        self.review_waited(healthy, self.lessees[0], days=2)
+
+        build = notifications.build_digest_message
+
+        def build_or_fail(owner, reviews):
+            if owner.username == 'broken':
+                raise ValueError('template error')
+            return build(owner, reviews)
+
+        with mock.patch.object(notifications, 'build_digest_message', build_or_fail), \
+                self.assertLogs('applications.reviews.notifications', 'ERROR'):
+            self.assertEqual(send_review_digests(), (1, 1))
 
-# Create your tests here.
+        self.assertEqual(self.recipients(), ['healthy@example.com'])
+        self.assertEqual(list(Review.objects.filter(notified_at__isnull=True)), [stuck])
@@ -1,6 +1,11 @@
 from django.urls import path
 
-from applications.bookings.views import BookingListCreateGenericAPIView, BookingDetailUpdateDeleteGenericAPIView
+from applications.bookings.views import (BookingListCreateGenericAPIView,
+                                         BookingDetailUpdateDeleteGenericAPIView,
+                                         BookingBulkStatusAPIView,
+                                         OwnerOccupancyStatsAPIView,
+                                         RentAvailabilityAPIView,
+                                         RentCalendarAPIView)
 from applications.rent.views import (RentListCreateGenericAPIView,
                                      RentDetailUpdateDeleteGenericAPIView,
                                      RentSwitchActiveAPIView,
@@ -16,8 +21,12 @@ urlpatterns = [
     path('rent/', RentListCreateGenericAPIView.as_view()),
     path('rent/<int:rent_id>/', RentDetailUpdateDeleteGenericAPIView.as_view()),
     path('rent/<int:rent_id>/switch-active/', RentSwitchActiveAPIView.as_view()),
+    path('rent/<int:rent_id>/availability/', RentAvailabilityAPIView.as_view()),
+    path('rent/<int:rent_id>/calendar.ics', RentCalendarAPIView.as_view()),
 
     path('bookings/', BookingListCreateGenericAPIView.as_view()),
+    path('bookings/bulk-status/', BookingBulkStatusAPIView.as_view()),
+    path('bookings/stats/', OwnerOccupancyStatsAPIView.as_view()),
     path('bookings/<int:booking_id>/', BookingDetailUpdateDeleteGenericAPIView.as_view()),
 
     path('reviews/', ReviewCreateGenericAPIView.as_view()),
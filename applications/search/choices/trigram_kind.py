@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class TrigramKind(str, Enum):
+    CITY = 'Город'
+    USERNAME = 'Имя пользователя'
+
+    @classmethod
+    def choices(cls):
+        return [(member.name, member.value) for member in cls]
@@ -0,0 +1,109 @@
+import re
+
+from django.db import transaction
+from django.db.models import Count
+
+from applications.search.models import TrigramTerm, Trigram
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Доля триграмм запроса, которая должна совпасть со значением
+SIMILARITY_THRESHOLD = 0.5
+
+
+def normalize(value: str) -> str:
+    value = (value or '').casefold().replace('ё', 'е')
+    return WHITESPACE_RE.sub(' ', value).strip()
+
+
+def trigrams(normalized: str) -> set[str]:
+    grams = set()
+    for word in normalized.split(' '):
+        if not word:
+            continue
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def register_value(kind: str, value: str):
+    if not value:
+        return
+
+    normalized = normalize(value)
+    grams = trigrams(normalized)
+
+    with transaction.atomic():
+        term, created = TrigramTerm.objects.get_or_create(
+            kind=kind,
+            value=value,
+            defaults={'normalized': normalized, 'gram_count': len(grams)}
+        )
+        if created:
+            Trigram.objects.bulk_create(
+                Trigram(term=term, kind=kind, gram=gram) for gram in grams
+            )
+
+
+def unregister_value(kind: str, value: str):
+    TrigramTerm.objects.filter(kind=kind, value=value).delete()
+
+
+def _prefix_matches(kind: str, normalized: str, limit: int | None) -> list[str]:
+    # LIKE 'префикс%' не зависит от порядка сортировки collation, в отличие от диапазона
+    # с искусственной верхней границей; normalized уже в нижнем регистре, так что
+    # регистронезависимое сравнение ничего лишнего не находит
+    return list(
+        TrigramTerm.objects
+        .filter(kind=kind, normalized__istartswith=normalized)
+        .order_by('normalized')
+        .values_list('value', flat=True)[:limit]
+    )
+
+
+def _fuzzy_matches(kind: str, normalized: str, limit: int | None) -> list[str]:
+    grams = trigrams(normalized)
+    if not grams:
+        return []
+
+    min_shared = max(1, int(len(grams) * SIMILARITY_THRESHOLD))
+
+    candidates = (
+        Trigram.objects
+        .filter(kind=kind, gram__in=grams)
+        .values('term_id')
+        .annotate(shared=Count('id'))
+        .filter(shared__gte=min_shared)
+        .order_by('-shared')
+        .values_list('term_id', 'shared')
+    )
+    if limit is not None:
+        candidates = candidates[:limit * 4]
+    shared_by_term = dict(candidates)
+
+    scored = []
+    for term in TrigramTerm.objects.filter(pk__in=shared_by_term).only('value', 'gram_count'):
+        shared = shared_by_term[term.pk]
+        similarity = shared / (len(grams) + term.gram_count - shared)
+        containment = shared / len(grams)
+        score = max(similarity, containment)
+        if score >= SIMILARITY_THRESHOLD:
+            scored.append((score, term.value))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [value for _, value in scored[:limit]]
+
+
+def match_values(kind: str, query: str, limit: int | None = None) -> list[str]:
+    """
+    Значения, начинающиеся с запроса, и следом похожие по триграммам (опечатки, подстроки).
+    Без limit возвращает все совпадения: результат используется как фильтр,
+    и обрезка молча теряла бы подходящие объявления.
+    """
+    normalized = normalize(query)
+    if not normalized:
+        return []
+
+    matches = dict.fromkeys(_prefix_matches(kind, normalized, limit))
+    matches.update(dict.fromkeys(_fuzzy_matches(kind, normalized, limit)))
+    return list(matches)[:limit]
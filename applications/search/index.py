@@ -0,0 +1,108 @@
+import math
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, When, F, FloatField, Sum, Count, Subquery, OuterRef, Value
+
+from applications.search.models import RentSearchTerm
+from applications.search.text import term_frequencies, terms
+
+# Вес поля в индексе: совпадение в заголовке важнее совпадения в описании
+FIELD_WEIGHTS = {
+    'title': 3,
+    'description': 1,
+}
+
+DOCUMENTS_COUNT_CACHE_KEY = 'search:rent:documents_count'
+DOCUMENTS_COUNT_TIMEOUT = 300
+
+
+def build_rent_terms(rent) -> Counter:
+    weights = Counter()
+    for field_name, field_weight in FIELD_WEIGHTS.items():
+        for term, frequency in term_frequencies(getattr(rent, field_name)).items():
+            weights[term] += frequency * field_weight
+    return weights
+
+
+def index_rent(rent):
+    if rent.is_deleted:
+        remove_rent(rent.pk)
+        return
+
+    weights = build_rent_terms(rent)
+
+    with transaction.atomic():
+        RentSearchTerm.objects.filter(rent_id=rent.pk).delete()
+        RentSearchTerm.objects.bulk_create(
+            RentSearchTerm(rent_id=rent.pk, term=term, weight=weight)
+            for term, weight in weights.items()
+        )
+
+
+def remove_rent(rent_id):
+    RentSearchTerm.objects.filter(rent_id=rent_id).delete()
+
+
+def parse_query(query: str) -> list[str]:
+    return list(dict.fromkeys(terms(query)))
+
+
+def _documents_count() -> int:
+    from applications.rent.models import Rent
+
+    return cache.get_or_set(DOCUMENTS_COUNT_CACHE_KEY, Rent.objects.count, DOCUMENTS_COUNT_TIMEOUT)
+
+
+def _idf(query_terms: list[str]) -> dict[str, float]:
+    documents = max(_documents_count(), 1)
+    frequencies = dict(
+        RentSearchTerm.objects
+        .filter(term__in=query_terms)
+        .values('term')
+        .annotate(df=Count('rent_id'))
+        .values_list('term', 'df')
+    )
+    return {
+        term: math.log(1 + (documents - df + 0.5) / (df + 0.5))
+        for term, df in frequencies.items()
+    }
+
+
+def search(queryset, query_terms: list[str]):
+    """
+    Сужает queryset до объявлений, содержащих все термы запроса,
+    и добавляет аннотацию search_rank (tf * idf по индексу).
+    """
+    idf = _idf(query_terms)
+
+    if len(idf) < len(query_terms):
+        return queryset.none()
+
+    score = Sum(
+        Case(
+            *[When(term=term, then=F('weight') * Value(weight)) for term, weight in idf.items()],
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+    )
+
+    matched = (
+        RentSearchTerm.objects
+        .filter(term__in=query_terms)
+        .values('rent_id')
+        .annotate(matched=Count('term'))
+        .filter(matched=len(query_terms))
+        .values('rent_id')
+    )
+
+    rank = (
+        RentSearchTerm.objects
+        .filter(rent_id=OuterRef('pk'), term__in=query_terms)
+        .values('rent_id')
+        .annotate(rank=score)
+        .values('rank')
+    )
+
+    return queryset.filter(pk__in=matched).annotate(search_rank=Subquery(rank, output_field=FloatField()))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from applications.rent.models.rent import Rent
+from applications.search.index import index_rent
+from applications.search.models import RentSearchTerm
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс объявлений'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+
+        RentSearchTerm.objects.all().delete()
+
+        indexed = 0
+        queryset = Rent.objects.only('id', 'title', 'description', 'is_deleted').order_by('id')
+        for rent in queryset.iterator(chunk_size=chunk_size):
+            index_rent(rent)
+            indexed += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано объявлений: {indexed}'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from applications.rent.models.locations import Address
+from applications.search.choices.trigram_kind import TrigramKind
+from applications.search.fuzzy import register_value
+from applications.search.models import TrigramTerm
+from applications.users.models.user import User
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает триграммный индекс городов и имен пользователей'
+
+    def handle(self, *args, **options):
+        TrigramTerm.objects.all().delete()
+
+        sources = (
+            (TrigramKind.CITY.name, Address.objects.values_list('city', flat=True)),
+            (TrigramKind.USERNAME.name, User.objects.values_list('username', flat=True)),
+        )
+
+        for kind, values in sources:
+            registered = 0
+            for value in values.distinct().order_by().iterator():
+                register_value(kind, value)
+                registered += 1
+            self.stdout.write(self.style.SUCCESS(f'{kind}: проиндексировано значений: {registered}'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('rent', '0008_alter_rent_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('rent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='rent.rent')),
+            ],
+            options={
+                'db_table': 'rent_search_term',
+                'indexes': [models.Index(fields=['term', 'rent', 'weight'], name='rent_search_term_idx')],
+                'constraints': [models.UniqueConstraint(fields=('rent', 'term'), name='unique_rent_search_term')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-18 10:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrigramTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('CITY', 'Город'), ('USERNAME', 'Имя пользователя')], max_length=16)),
+                ('value', models.CharField(max_length=128)),
+                ('normalized', models.CharField(max_length=128)),
+                ('gram_count', models.PositiveSmallIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'trigram_term',
+                'indexes': [models.Index(fields=['kind', 'normalized'], name='trigram_term_prefix_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'value'), name='unique_trigram_term_value')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Trigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('CITY', 'Город'), ('USERNAME', 'Имя пользователя')], max_length=16)),
+                ('gram', models.CharField(max_length=3)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='grams', to='search.trigramterm')),
+            ],
+            options={
+                'db_table': 'trigram',
+                'indexes': [models.Index(fields=['kind', 'gram', 'term'], name='trigram_lookup_idx')],
+                'constraints': [models.UniqueConstraint(fields=('term', 'gram'), name='unique_trigram_per_term')],
+            },
+        ),
+    ]
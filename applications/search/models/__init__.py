@@ -0,0 +1,2 @@
+from applications.search.models.rent_search_term import RentSearchTerm
+from applications.search.models.trigram import TrigramTerm, Trigram
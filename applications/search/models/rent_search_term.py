@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class RentSearchTerm(models.Model):
+    rent = models.ForeignKey(
+        'rent.Rent',
+        on_delete=models.CASCADE,
+        related_name='search_terms'
+    )
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        db_table = 'rent_search_term'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['rent', 'term'],
+                name='unique_rent_search_term'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['term', 'rent', 'weight'], name='rent_search_term_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.term} → {self.rent_id} ({self.weight})'
@@ -0,0 +1,50 @@
+from django.db import models
+
+from applications.search.choices.trigram_kind import TrigramKind
+
+
+class TrigramTerm(models.Model):
+    kind = models.CharField(max_length=16, choices=TrigramKind.choices())
+    value = models.CharField(max_length=128)
+    normalized = models.CharField(max_length=128)
+    gram_count = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        db_table = 'trigram_term'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'value'],
+                name='unique_trigram_term_value'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'normalized'], name='trigram_term_prefix_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}: {self.value}'
+
+
+class Trigram(models.Model):
+    term = models.ForeignKey(
+        TrigramTerm,
+        on_delete=models.CASCADE,
+        related_name='grams'
+    )
+    kind = models.CharField(max_length=16, choices=TrigramKind.choices())
+    gram = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = 'trigram'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['term', 'gram'],
+                name='unique_trigram_per_term'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'gram', 'term'], name='trigram_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.gram} → {self.term_id}'
@@ -0,0 +1,72 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from applications.rent.models.locations import Address
+from applications.rent.models.rent import Rent
+from applications.search.choices.trigram_kind import TrigramKind
+from applications.search.fuzzy import register_value, unregister_value
+from applications.search.index import FIELD_WEIGHTS, index_rent
+from applications.users.models.user import User
+
+INDEX_TRIGGER_FIELDS = {*FIELD_WEIGHTS, 'is_deleted'}
+
+# Поле модели, значения которого попадают в триграммный индекс
+TRIGRAM_FIELDS = {
+    Address: ('city', TrigramKind.CITY.name),
+    User: ('username', TrigramKind.USERNAME.name),
+}
+
+
+@receiver(post_save, sender=Rent)
+def update_rent_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not INDEX_TRIGGER_FIELDS.intersection(update_fields):
+        return
+    index_rent(instance)
+
+
+def _tracks_field(field_name, update_fields):
+    return update_fields is None or field_name in update_fields
+
+
+def _remember_trigram_value(instance, field_name):
+    # Отложенное поле (only/defer) не читаем, чтобы не делать лишний запрос
+    field = instance._meta.get_field(field_name)
+    instance._trigram_previous = instance.__dict__.get(field.attname)
+
+
+@receiver(post_init, sender=Address)
+@receiver(post_init, sender=User)
+def remember_trigram_value(sender, instance, **kwargs):
+    # Значение на момент загрузки: при сохранении не нужно перечитывать строку из БД
+    field_name, _ = TRIGRAM_FIELDS[sender]
+    _remember_trigram_value(instance, field_name)
+
+
+@receiver(post_save, sender=Address)
+@receiver(post_save, sender=User)
+def update_trigram_index(sender, instance, created, update_fields=None, **kwargs):
+    field_name, kind = TRIGRAM_FIELDS[sender]
+    if not _tracks_field(field_name, update_fields):
+        return
+
+    value = getattr(instance, field_name)
+    previous = getattr(instance, '_trigram_previous', None)
+    if not created and previous == value:
+        return
+
+    if not created and previous is not None:
+        release_trigram_value(sender, field_name, kind, previous)
+    register_value(kind, value)
+    _remember_trigram_value(instance, field_name)
+
+
+@receiver(post_delete, sender=Address)
+@receiver(post_delete, sender=User)
+def remove_from_trigram_index(sender, instance, **kwargs):
+    field_name, kind = TRIGRAM_FIELDS[sender]
+    release_trigram_value(sender, field_name, kind, getattr(instance, field_name))
+
+
+def release_trigram_value(model, field_name, kind, value):
+    if not model._default_manager.filter(**{field_name: value}).exists():
+        unregister_value(kind, value)
@@ -0,0 +1,116 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from applications.factories import make_user, make_address, make_rent
+from applications.search.choices.trigram_kind import TrigramKind
+from applications.search.fuzzy import match_values, register_value
+from applications.search.models import RentSearchTerm, TrigramTerm
+from applications.users.models import User
+
+
+class SearchFixtureMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user('ivanov', 'LESSOR')
+
+    def make_rent(self, title, description, city='Berlin', price=50, owner=None):
+        return make_rent(
+            owner or self.owner, title, make_address(city=city, street=title), description=description, price=price
+        )
+
+    def titles(self, **params):
+        response = self.client.get('/api/v1/rent/', params)
+        self.assertEqual(response.status_code, 200)
+        return [row['title'] for row in response.data['results']]
+
+
+class RentSearchTests(SearchFixtureMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.seaside = self.make_rent('Уютная квартира у моря', 'Квартира с видом на море', price=90)
+        self.forest = self.make_rent('Дом в лесу', 'Рядом квартира соседей', price=40)
+        self.make_rent('Студия', 'Центр города')
+
+    def test_title_matches_rank_higher(self):
+        self.assertEqual(self.titles(search='квартира'), [self.seaside.title, self.forest.title])
+
+    def test_word_forms_share_stem(self):
+        self.assertEqual(self.titles(search='квартиры'), [self.seaside.title, self.forest.title])
+        self.assertEqual(self.titles(search='морем'), [self.seaside.title])
+
+    def test_all_query_terms_required(self):
+        self.assertEqual(self.titles(search='квартира лес'), [self.forest.title])
+        self.assertEqual(self.titles(search='квартира пустыня'), [])
+
+    def test_explicit_ordering_overrides_rank(self):
+        self.assertEqual(self.titles(search='квартира', ordering='price'), [self.forest.title, self.seaside.title])
+
+    def test_index_follows_changes_and_soft_delete(self):
+        self.forest.title = 'Квартира в лесу'
+        self.forest.save()
+        self.assertEqual(RentSearchTerm.objects.get(rent=self.forest, term='квартир').weight, 4)
+
+        self.seaside.delete()
+        self.assertFalse(RentSearchTerm.objects.filter(rent_id=self.seaside.pk).exists())
+        self.assertEqual(self.titles(search='квартиры'), [self.forest.title])
+
+
+class TrigramFilterTests(SearchFixtureMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.petrov = make_user('petrov', 'LESSOR')
+        self.berlin = self.make_rent('Квартира в Берлине', 'Центр', city='Berlin')
+        self.bern = self.make_rent('Квартира в Берне', 'Центр', city='Bern')
+        self.hamburg = self.make_rent('Квартира в Гамбурге', 'Порт', city='Hamburg', owner=self.petrov)
+
+    def test_prefix_match(self):
+        self.assertEqual(sorted(match_values(TrigramKind.CITY.name, 'ber')), ['Berlin', 'Bern'])
+        self.assertCountEqual(self.titles(city='BER'), [self.berlin.title, self.bern.title])
+
+    def test_typo_falls_back_to_trigrams(self):
+        self.assertEqual(match_values(TrigramKind.CITY.name, 'Berlni'), ['Berlin'])
+        self.assertCountEqual(self.titles(owner='ivonov'), [self.berlin.title, self.bern.title])
+        # Совпало меньше половины триграмм — не то же имя
+        self.assertEqual(self.titles(owner='petorv'), [])
+
+    def test_renamed_value_leaves_index(self):
+        address = self.hamburg.address
+        address.city = 'Munich'
+        address.save()
+
+        self.assertEqual(match_values(TrigramKind.CITY.name, 'hamb'), [])
+        self.assertEqual(match_values(TrigramKind.CITY.name, 'munic'), ['Munich'])
+
+    def test_substring_matches_alongside_prefix_hits(self):
+        burgdorf = self.make_rent('Квартира в Бургдорфе', 'Центр', city='Burgdorf')
+
+        self.assertEqual(match_values(TrigramKind.CITY.name, 'burg'), ['Burgdorf', 'Hamburg'])
+        self.assertCountEqual(self.titles(city='burg'), [burgdorf.title, self.hamburg.title])
+
+    def test_matches_are_not_capped(self):
+        cities = [f'B{i:03}' for i in range(60)]
+        for city in cities:
+            register_value(TrigramKind.CITY.name, city)
+
+        self.assertEqual(len(match_values(TrigramKind.CITY.name, 'b')), len(cities) + 2)
+
+    def test_save_without_rename_keeps_index(self):
+        owner = User.objects.get(pk=self.petrov.pk)
+        with CaptureQueriesContext(connection) as queries:
+            owner.first_name = 'Петр'
+            owner.save()
+        # Имя не менялось: ни перечитывания пользователя, ни обращений к триграммам
+        self.assertFalse([query['sql'] for query in queries if not query['sql'].startswith('UPDATE')])
+        self.assertFalse([query['sql'] for query in queries if 'trigram' in query['sql']])
+
+        owner.username = 'petrova'
+        owner.save()
+        self.assertEqual(
+            sorted(TrigramTerm.objects.filter(kind=TrigramKind.USERNAME.name).values_list('value', flat=True)),
+            ['ivanov', 'petrova']
+        )
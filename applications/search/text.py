@@ -0,0 +1,36 @@
+import re
+from collections import Counter
+from functools import lru_cache
+
+import snowballstemmer
+
+TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+CYRILLIC_RE = re.compile(r'[а-яё]')
+
+MIN_TOKEN_LENGTH = 2
+MAX_TERM_LENGTH = 64
+
+_russian = snowballstemmer.stemmer('russian')
+_english = snowballstemmer.stemmer('english')
+
+
+@lru_cache(maxsize=20_000)
+def stem(token: str) -> str:
+    if CYRILLIC_RE.search(token):
+        return _russian.stemWord(token)
+    return _english.stemWord(token)
+
+
+def tokenize(text: str) -> list[str]:
+    if not text:
+        return []
+    text = text.lower().replace('ё', 'е')
+    return [token for token in TOKEN_RE.findall(text) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def terms(text: str) -> list[str]:
+    return [stem(token)[:MAX_TERM_LENGTH] for token in tokenize(text)]
+
+
+def term_frequencies(text: str) -> Counter:
+    return Counter(terms(text))
@@ -4,6 +4,7 @@ from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
 from django.db.models import Q
 from django.utils import timezone
+from .cache import invalidate_users
 from .models import User
 
 
@@ -53,6 +54,9 @@ class CustomUserAdmin(UserAdmin):
                 'role'
             )
         }),
+        (_('Уведомления'), {
+            'fields': ('review_digest',)
+        }),
         (_('Права доступа'), {
             'fields': (
                 'is_active',
@@ -110,7 +114,9 @@ class CustomUserAdmin(UserAdmin):
     @admin.action(description=_('Активировать выбранных пользователей'))
     def activate_users(self, request, queryset):
 
+        user_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_active=True)
+        invalidate_users(user_ids, is_active=True)
         self.message_user(
             request,
             _(f'Активировано пользователей: {updated}')
@@ -129,7 +135,9 @@ class CustomUserAdmin(UserAdmin):
             )
             return
 
+        user_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_active=False)
+        invalidate_users(user_ids, is_active=False)
         self.message_user(
             request,
             _(f'Деактивировано пользователей: {updated}')
@@ -137,7 +145,9 @@ class CustomUserAdmin(UserAdmin):
 
     @admin.action(description=_('Назначить персоналом'))
     def make_staff(self, request, queryset):
+        user_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_staff=True)
+        invalidate_users(user_ids)
         self.message_user(
             request,
             _(f'Назначено персоналом: {updated}')
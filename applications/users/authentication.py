@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from applications.users.cache import user_cache, is_marked_inactive
+from applications.users.tokens import has_user_claims, user_from_claims
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с одной проверкой подписи на запрос.
+
+    Токен из cookie уже проверен JWTAuthenticationMiddleware и лежит в request.jwt_access_token;
+    токен из заголовка Authorization проверяется здесь. На чтение пользователь собирается
+    из claims без запроса в БД; на запись (при JWT_DB_USER_FOR_WRITES) берется из кэша
+    пользователей воркера, который сбрасывается при сохранении пользователя.
+    """
+
+    def authenticate(self, request):
+        validated_token = getattr(request._request, 'jwt_access_token', None)
+        if validated_token is None:
+            header = self.get_header(request)
+            if header is None:
+                return None
+
+            raw_token = self.get_raw_token(header)
+            if raw_token is None:
+                return None
+
+            validated_token = self.get_validated_token(raw_token)
+
+        return self.resolve_user(validated_token, request.method), validated_token
+
+    def resolve_user(self, validated_token, method):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        # Заблокированный пользователь отклоняется сразу, не дожидаясь истечения токена
+        if is_marked_inactive(user_id):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if not has_user_claims(validated_token):
+            return self.get_user(validated_token)
+        if settings.JWT_DB_USER_FOR_WRITES and method not in SAFE_METHODS:
+            return self.get_user(validated_token)
+
+        if not validated_token['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user_from_claims(validated_token)
+
+    def get_user(self, validated_token):
+        user = user_cache.load(validated_token[api_settings.USER_ID_CLAIM])
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
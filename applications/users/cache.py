@@ -0,0 +1,98 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from applications.users.models.user import User
+
+
+class UserCache:
+    """
+    LRU-кэш пользователей по id в памяти процесса с ограничением по времени жизни записи.
+    В другие воркеры инвалидация не доходит: изменения роли, прав и пароля они видят
+    с задержкой до ttl секунд, поэтому TTL должен быть коротким. Блокировки пользователей
+    дополнительно расходятся через кэш Django (см. mark_inactive).
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # Копия: запрос не должен менять объект, который видят другие запросы
+        return copy.copy(user)
+
+    def set(self, user):
+        with self._lock:
+            self._entries[user.pk] = (copy.copy(user), time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.pk)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids):
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def load(self, user_id):
+        user = self.get(user_id)
+        if user is None:
+            user = User.objects.filter(pk=user_id).first()
+            if user is not None:
+                self.set(user)
+        return user
+
+
+user_cache = UserCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+def _inactive_key(user_id):
+    return f'user_inactive:{user_id}'
+
+
+def mark_inactive(user_ids):
+    # Метка живет, пока могут жить выданные пользователю access-токены с is_active=True.
+    # Остальные воркеры видят ее только при общем кэше (CACHE_URL); с кэшем в памяти процесса
+    # заблокированный пользователь проходит в других воркерах, пока не истечет его запись
+    # в их user_cache (USER_CACHE_TTL) и access-токен с is_active=True
+    timeout = int(settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds())
+    cache.set_many({_inactive_key(user_id): True for user_id in user_ids}, timeout)
+
+
+def clear_inactive(user_ids):
+    cache.delete_many([_inactive_key(user_id) for user_id in user_ids])
+
+
+def is_marked_inactive(user_id) -> bool:
+    return bool(cache.get(_inactive_key(user_id)))
+
+
+def invalidate_users(user_ids, is_active=None):
+    """Сбрасывает пользователей из кэша после изменения (в т.ч. через queryset.update)."""
+    user_ids = list(user_ids)
+    user_cache.invalidate(user_ids)
+    if is_active is False:
+        mark_inactive(user_ids)
+    elif is_active:
+        clear_inactive(user_ids)
+    # Конкурентный запрос мог успеть положить в кэш старую версию до коммита
+    transaction.on_commit(lambda: user_cache.invalidate(user_ids))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from applications.users.revocation import prune_revoked_tokens
+
+
+class Command(BaseCommand):
+    help = 'Удаляет записи об отозванных refresh-токенах, срок действия которых истек (запускать по расписанию)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        pruned = prune_revoked_tokens(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Удалено записей: {pruned}'))
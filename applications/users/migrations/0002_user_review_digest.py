@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='review_digest',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1 +1,2 @@
-from applications.users.models.user import User
\ No newline at end of file
+from applications.users.models.user import User
+from applications.users.models.revoked_token import RevokedToken
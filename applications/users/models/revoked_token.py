@@ -0,0 +1,19 @@
+from django.db import models
+
+from applications.users.models.user import User
+
+
+class RevokedToken(models.Model):
+    """Отозванный refresh-токен. Запись нужна только до истечения токена (см. prune_revoked_tokens)."""
+    jti = models.CharField(max_length=64, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='revoked_tokens', null=True, blank=True)
+    # Токен заменен новым при обновлении, а не отозван при выходе
+    rotated = models.BooleanField(default=False)
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'revoked_token'
+
+    def __str__(self):
+        return self.jti
@@ -21,6 +21,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     date_joined = models.DateTimeField(default=timezone.now)
     birth_day = models.DateField(null=True, blank=True)
+    # Письма о новых отзывах приходят сводкой раз в окно, а не на каждый отзыв
+    review_digest = models.BooleanField(default=False)
 
     objects = UserManager()
 
@@ -0,0 +1,172 @@
+import datetime
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from applications.users.models.revoked_token import RevokedToken
+
+# Меняется при явном отзыве (выход), чтобы остальные воркеры досинхронизировали фильтр сразу.
+# Работает только с общим кэшем (CACHE_URL); с кэшем в памяти процесса другие воркеры
+# узнают об отзыве при очередной синхронизации, не позже чем через REVOKED_TOKENS_SYNC_INTERVAL
+GENERATION_KEY = 'revoked_tokens:generation'
+
+# Перекрытие при инкрементальной загрузке: строки, закоммиченные позже своего revoked_at, не теряются
+SYNC_OVERLAP = datetime.timedelta(seconds=5)
+
+
+class BloomFilter:
+    """
+    Битовый массив с k хэш-функциями. Отвечает «точно нет» или «возможно да»;
+    ложноположительные ответы допустимы с вероятностью error_rate при заполнении до capacity.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Двойное хэширование: k позиций из двух половин одного дайджеста
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """
+    Фильтр отозванных jti в памяти воркера перед таблицей RevokedToken.
+    Обращение к таблице нужно только при положительном ответе фильтра. Новые записи
+    подгружаются раз в sync_interval секунд или сразу после смены поколения в общем кэше;
+    когда фильтр переполняется, он перестраивается по неистекшим записям.
+
+    Отставший фильтр не пропускает повторное использование токена при включенной ротации:
+    ротация вставляет jti в таблицу, и конфликт уникального ключа находит отзыв сразу.
+    Без ротации отозванный токен принимается другими воркерами до их синхронизации.
+    """
+
+    def __init__(self, capacity, error_rate, sync_interval):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._filter = None
+        self._generation = None
+        self._synced_at = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _rebuild(self, now):
+        jtis = list(RevokedToken.objects.filter(expires_at__gt=now).values_list('jti', flat=True))
+        bloom = BloomFilter(max(self.capacity, len(jtis) * 2), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        self._filter = bloom
+
+    def _sync(self, generation):
+        now = timezone.now()
+        if self._filter is None or self._filter.count >= self._filter.capacity:
+            self._rebuild(now)
+        else:
+            recent = RevokedToken.objects.filter(revoked_at__gte=self._synced_at - SYNC_OVERLAP)
+            for jti in recent.values_list('jti', flat=True):
+                self._filter.add(jti)
+        self._synced_at = now
+        self._generation = generation
+        self._checked_at = time.monotonic()
+
+    def _current_filter(self) -> BloomFilter:
+        generation = cache.get(GENERATION_KEY)
+        with self._lock:
+            if (self._filter is None or generation != self._generation
+                    or time.monotonic() - self._checked_at > self.sync_interval):
+                self._sync(generation)
+            return self._filter
+
+    def might_be_revoked(self, jti) -> bool:
+        return jti in self._current_filter()
+
+    def add(self, jti):
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOKED_TOKENS_FILTER_CAPACITY,
+    error_rate=settings.REVOKED_TOKENS_FILTER_ERROR_RATE,
+    sync_interval=settings.REVOKED_TOKENS_SYNC_INTERVAL
+)
+
+
+def revoked_entry(token) -> RevokedToken | None:
+    """Запись об отзыве refresh-токена; для большинства токенов отвечает без запроса в БД."""
+    jti = token[api_settings.JTI_CLAIM]
+    if not revocation_list.might_be_revoked(jti):
+        return None
+    return RevokedToken.objects.filter(jti=jti).first()
+
+
+def in_reuse_grace(entry: RevokedToken) -> bool:
+    # Параллельные запросы со старым refresh-токеном, пришедшие сразу после ротации
+    grace = datetime.timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE)
+    return entry.rotated and entry.revoked_at >= timezone.now() - grace
+
+
+def revoke(token, rotated=False) -> bool:
+    """
+    Отзывает refresh-токен. Возвращает False, если его уже отозвал другой запрос:
+    уникальный jti в таблице — единственная точка, где решается, кто первым сменил токен.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(
+                jti=jti,
+                user_id=token.get(api_settings.USER_ID_CLAIM),
+                rotated=rotated,
+                expires_at=datetime.datetime.fromtimestamp(token['exp'], datetime.UTC)
+            )
+    except IntegrityError:
+        # Другие нарушения (например, пользователя уже удалили) — не отзыв
+        if not RevokedToken.objects.filter(jti=jti).exists():
+            raise
+        # Уже отозван: в фильтр его тоже стоит добавить, если воркер еще не синхронизировался
+        revocation_list.add(jti)
+        if not rotated:
+            # Выход закрывает и льготное окно после ротации
+            RevokedToken.objects.filter(jti=jti).update(rotated=False)
+        return False
+
+    revocation_list.add(jti)
+    if not rotated:
+        cache.set(GENERATION_KEY, jti, None)
+    return True
+
+
+def prune_revoked_tokens(chunk_size=1000) -> int:
+    """Удаляет записи об истекших токенах: такие токены отклоняются и без них."""
+    expired = RevokedToken.objects.filter(expires_at__lte=timezone.now()).order_by('pk')
+    pruned = 0
+    while True:
+        pks = list(expired.values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            break
+        pruned += RevokedToken.objects.filter(pk__in=pks).delete()[0]
+    return pruned
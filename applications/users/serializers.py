@@ -30,6 +30,7 @@ class RegisterUserSerializer(serializers.ModelSerializer):
         required=True
     )
     is_staff = serializers.BooleanField(required=False)
+    review_digest = serializers.BooleanField(required=False)
 
     class Meta:
         model = User
@@ -41,7 +42,8 @@ class RegisterUserSerializer(serializers.ModelSerializer):
             're_password',
             'email',
             'role',
-            'is_staff'
+            'is_staff',
+            'review_digest'
         ]
 
     def validate(self, attrs):
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from applications.users.cache import invalidate_users
+from applications.users.models.user import User
+
+
+@receiver(post_save, sender=User)
+def reset_cached_user(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_users([instance.pk], is_active=instance.is_active)
+
+
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_users([instance.pk], is_active=False)
@@ -1,3 +1,315 @@
-from django.test import TestCase
+import datetime
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache, caches
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from applications.bookings.models import Booking
+from applications.factories import PASSWORD, make_user, make_rent
+from applications.middleware.api import WebAuthenticationMiddleware
+from applications.users.cache import user_cache
+from applications.users.models import RevokedToken, User
+from applications.users.revocation import GENERATION_KEY, BloomFilter, revocation_list
+from applications.users.throttling import EmailTokenBucketThrottle, TokenBucketThrottle
+from applications.users.tokens import add_user_claims, user_from_claims
+
+
+class UserFromClaimsTests(APITestCase):
+
+    def test_claims_land_in_their_fields(self):
+        user = make_user('staff', 'LESSOR', is_staff=True)
+        token = add_user_claims(AccessToken.for_user(user), user)
+
+        restored = user_from_claims(token)
+
+        self.assertEqual(restored.pk, user.pk)
+        self.assertEqual(restored.role, 'LESSOR')
+        self.assertIs(restored.is_staff, True)
+        self.assertIs(restored.is_superuser, False)
+        self.assertIs(restored.is_active, True)
+
+    def test_superuser_claims(self):
+        user = User.objects.create_superuser(
+            email='admin@example.com', password='StrongPassw0rd!', username='admin', role='ADMIN'
+        )
+        restored = user_from_claims(add_user_claims(AccessToken.for_user(user), user))
+
+        self.assertEqual(restored.role, 'ADMIN')
+        self.assertIs(restored.is_superuser, True)
+        self.assertIs(restored.is_staff, True)
+
+
+class ClaimsAuthenticationScopingTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = make_user('owner', 'LESSOR')
+        self.lessee = make_user('lessee', 'LESSEE')
+        self.stranger = make_user('stranger', 'LESSEE')
+        rent = make_rent(self.owner)
+        start = datetime.date.today() + datetime.timedelta(days=10)
+        self.booking = Booking.objects.create(
+            lessee=self.lessee, rent=rent, start_date=start, end_date=start + datetime.timedelta(days=3)
+        )
+
+    def login(self, user):
+        response = self.client.post(
+            '/api/v1/auth-login/', {'email': user.email, 'password': PASSWORD}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def booking_ids(self):
+        response = self.client.get('/api/v1/bookings/')
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_unrelated_lessee_sees_no_bookings(self):
+        self.login(self.stranger)
+
+        self.assertEqual(self.booking_ids(), [])
+        self.assertEqual(self.client.get(f'/api/v1/bookings/{self.booking.pk}/').status_code, 403)
+
+    def test_lessee_and_owner_see_their_booking(self):
+        self.login(self.lessee)
+        self.assertEqual(self.booking_ids(), [self.booking.pk])
+        self.assertEqual(self.client.get(f'/api/v1/bookings/{self.booking.pk}/').status_code, 200)
+
+        self.login(self.owner)
+        self.assertEqual(self.booking_ids(), [self.booking.pk])
+
+
+class RefreshRotationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('lessee', 'LESSEE')
+        response = self.client.post(
+            '/api/v1/auth-login/', {'email': self.user.email, 'password': PASSWORD}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.refresh = self.client.cookies['refresh_token'].value
+
+    def tearDown(self):
+        # Фильтр живет в памяти процесса и переживает откат БД между тестами
+        revocation_list._filter = None
+
+    def request_with(self, refresh, client=None):
+        # Access-токена нет: middleware обновляет его по refresh-токену
+        client = client or APIClient()
+        client.cookies['refresh_token'] = refresh
+        return client.get('/api/v1/bookings/')
+
+    def expire_grace(self):
+        RevokedToken.objects.update(revoked_at=timezone.now() - datetime.timedelta(hours=1))
+
+    def test_refresh_rotates_and_revokes_old_token(self):
+        response = self.request_with(self.refresh)
+
+        self.assertEqual(response.status_code, 200)
+        new_refresh = response.cookies['refresh_token'].value
+        self.assertNotEqual(new_refresh, self.refresh)
+        old_jti = RefreshToken(self.refresh)['jti']
+        self.assertTrue(RevokedToken.objects.filter(jti=old_jti, rotated=True).exists())
+        self.assertEqual(self.request_with(new_refresh).status_code, 200)
+
+    def test_old_token_within_grace_gets_access_only(self):
+        self.request_with(self.refresh)
+
+        response = self.request_with(self.refresh)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access_token', response.cookies)
+        self.assertNotIn('refresh_token', response.cookies)
+        self.assertEqual(RevokedToken.objects.count(), 1)
+
+    def test_old_token_after_grace_is_rejected(self):
+        self.request_with(self.refresh)
+        self.expire_grace()
+
+        response = self.request_with(self.refresh)
+
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.cookies['refresh_token'].value, '')
+
+    def test_reuse_is_rejected_by_worker_with_stale_filter(self):
+        self.request_with(self.refresh)
+        self.expire_grace()
+        # Воркер, который еще не видел отзыва: пустой фильтр, синхронизация не наступила
+        revocation_list._filter = BloomFilter(100, 0.01)
+        revocation_list._generation = cache.get(GENERATION_KEY)
+        revocation_list._checked_at = time.monotonic()
+
+        self.assertEqual(self.request_with(self.refresh).status_code, 401)
+
+    def test_logout_revokes_refresh_token(self):
+        self.client.cookies['access_token'] = str(RefreshToken(self.refresh).access_token)
+        response = self.client.post('/api/v1/auth-logout/')
+
+        self.assertEqual(response.status_code, 200)
+        jti = RefreshToken(self.refresh)['jti']
+        self.assertTrue(RevokedToken.objects.filter(jti=jti, rotated=False).exists())
+        self.assertEqual(self.request_with(self.refresh).status_code, 401)
+
+
+class DeactivationTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.user = make_user('lessee', 'LESSEE')
+        response = self.client.post(
+            '/api/v1/auth-login/', {'email': self.user.email, 'password': PASSWORD}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivated_user_rejected_despite_cached_copy(self):
+        # Небезопасный запрос кладет пользователя в кэш воркера
+        self.client.post('/api/v1/bookings/', {}, format='json')
+        stale = user_cache.get(self.user.pk)
+        self.assertIsNotNone(stale)
+
+        self.user.is_active = False
+        self.user.save()
+        # Воркер, до которого сброс кэша не дошел, все еще держит активную копию
+        user_cache.set(stale)
+
+        # Access-токен еще действует и несет is_active=True
+        self.assertEqual(self.client.get('/api/v1/bookings/').status_code, 401)
+        self.assertEqual(self.client.post('/api/v1/bookings/', {}, format='json').status_code, 401)
+
+
+class LoginThrottleTests(APITestCase):
+    EMAIL_BURST = 5
+
+    def setUp(self):
+        cache.clear()
+        make_user('lessee', 'LESSEE')
+
+    def test_throttled_before_password_check(self):
+        credentials = {'email': 'lessee@example.com', 'password': 'WrongPassw0rd!'}
+        with mock.patch('applications.users.views.authenticate', return_value=None) as authenticate:
+            codes = [
+                self.client.post('/api/v1/auth-login/', credentials, format='json').status_code
+                for _ in range(self.EMAIL_BURST + 2)
+            ]
+
+        self.assertEqual(codes, [401] * self.EMAIL_BURST + [429, 429])
+        self.assertEqual(authenticate.call_count, self.EMAIL_BURST)
+
+    def test_email_bucket_is_case_insensitive(self):
+        for _ in range(self.EMAIL_BURST):
+            self.client.post('/api/v1/auth-login/', {'email': 'lessee@example.com', 'password': 'x'}, format='json')
+
+        response = self.client.post(
+            '/api/v1/auth-login/', {'email': ' LESSEE@example.com', 'password': 'x'}, format='json'
+        )
+        self.assertEqual(response.status_code, 429)
+
+    def test_parallel_attempts_take_one_token_each(self):
+        threads_count = 20
+        view = SimpleNamespace(throttle_scope='login')
+        request = SimpleNamespace(method='POST', data={'email': 'lessee@example.com'})
+        barrier = threading.Barrier(threads_count)
+        allowed = []
+
+        def attempt():
+            barrier.wait()
+            allowed.append(EmailTokenBucketThrottle().allow_request(request, view))
+
+        # Пауза между чтением и записью корзины расширяет окно гонки.
+        # Экземпляры бэкенда кэша у потоков свои, поэтому патчится класс
+        backend_class = type(caches['default'])
+        original_get = backend_class.get
+
+        def slow_get(backend, *args, **kwargs):
+            value = original_get(backend, *args, **kwargs)
+            time.sleep(0.01)
+            return value
+
+        threads = [threading.Thread(target=attempt) for _ in range(threads_count)]
+        with mock.patch.object(backend_class, 'get', slow_get):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(allowed.count(True), self.EMAIL_BURST)
+
+    def test_forwarded_for_does_not_split_ip_bucket(self):
+        ip_burst = 20
+        codes = [
+            self.client.post(
+                '/api/v1/auth-login/', {'email': f'guest{i}@example.com', 'password': 'x'},
+                format='json', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}'
+            ).status_code
+            for i in range(ip_burst + 1)
+        ]
+        self.assertEqual(codes[-1], 429)
+
+    def test_expired_lock_taken_by_another_worker_is_kept(self):
+        view = SimpleNamespace(throttle_scope='login')
+        request = SimpleNamespace(method='POST', data={'email': 'lessee@example.com'})
+        throttle = EmailTokenBucketThrottle()
+        backend_class = type(caches['default'])
+        original_set = backend_class.set
+
+        def slow_set(backend, key, *args, **kwargs):
+            original_set(backend, key, *args, **kwargs)
+            # Пока воркер писал корзину, его блокировка истекла и ее взял другой
+            original_set(backend, f'{throttle.key}:lock', 'other-worker')
+
+        with mock.patch.object(backend_class, 'set', slow_set):
+            self.assertTrue(throttle.allow_request(request, view))
+
+        self.assertEqual(cache.get(f'{throttle.key}:lock'), 'other-worker')
+
+    def test_base_throttle_is_abstract(self):
+        with self.assertRaises(TypeError):
+            TokenBucketThrottle()
+
+
+class APIMiddlewareTests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            email='admin@example.com', password=PASSWORD, username='admin', role='ADMIN'
+        )
+
+    def test_api_request_skips_django_auth(self):
+        request = RequestFactory().get('/api/v1/bookings/')
+        middleware = WebAuthenticationMiddleware(lambda request: hasattr(request, 'user'))
+        self.assertIs(middleware(request), False)
+
+        request = RequestFactory().get('/admin/')
+        request.session = {}
+        self.assertIs(middleware(request), True)
+
+    def test_admin_session_not_used_by_api(self):
+        self.client.force_login(self.admin)
+
+        self.assertEqual(self.client.get('/admin/').status_code, 200)
+
+        response = self.client.get('/api/v1/bookings/')
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn('sessionid', response.cookies)
+        self.assertNotIn('csrftoken', response.cookies)
+
+    def test_unauthenticated_api_request_gets_401(self):
+        response = self.client.get('/api/v1/bookings/')
+
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Bearer', response['WWW-Authenticate'])
+
+    def test_api_post_needs_no_csrf_token(self):
+        client = APIClient(enforce_csrf_checks=True)
+        response = client.post(
+            '/api/v1/auth-login/', {'email': self.admin.email, 'password': PASSWORD}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,106 @@
+import abc
+import hashlib
+import time
+import uuid
+
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle, abc.ABC):
+    """
+    Token bucket в общем кэше. Ставка 'N/период' означает корзину на N попыток,
+    которая пополняется по N за период; в кэше хранится только пара (остаток, время).
+    Чтение и запись корзины идут под блокировкой ключа (cache.add), иначе параллельные
+    запросы прочитали бы один и тот же остаток и прошли бы все.
+    Область ставки — '<throttle_scope view>_<scope_suffix>', ограничиваются только небезопасные методы.
+    Проверка выполняется в initial() view, то есть до разбора пароля и вычисления хэша.
+    """
+    scope_suffix = None
+
+    # Блокировка корзины: сколько она живет, если воркер упал, и сколько ждать ее освобождения
+    LOCK_TIMEOUT = 2
+    LOCK_ATTEMPTS = 50
+    LOCK_RETRY_DELAY = 0.005
+
+    def __init__(self):
+        # Ставка зависит от view и определяется в allow_request
+        pass
+
+    @abc.abstractmethod
+    def get_ident_key(self, request):
+        """Идентификатор клиента для ключа корзины или None, если ограничивать нечего."""
+
+    def get_cache_key(self, request, view):
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+
+        self.scope = f'{view.throttle_scope}_{self.scope_suffix}'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        refill_rate = self.num_requests / self.duration
+        lock_key = f'{self.key}:lock'
+        lock_token = uuid.uuid4().hex
+        if not self._acquire(lock_key, lock_token):
+            # Корзину держат другие попытки того же клиента: это и есть всплеск
+            self.wait_seconds = 1 / refill_rate
+            return False
+
+        try:
+            self.now = self.timer()
+            tokens, updated_at = self.cache.get(self.key, (self.num_requests, self.now))
+            tokens = min(self.num_requests, tokens + (self.now - updated_at) * refill_rate)
+
+            if tokens < 1:
+                self.wait_seconds = (1 - tokens) / refill_rate
+                return False
+
+            # За duration секунд корзина наполняется полностью, дальше запись не нужна
+            self.cache.set(self.key, (tokens - 1, self.now), self.duration)
+            return True
+        finally:
+            self._release(lock_key, lock_token)
+
+    def _acquire(self, lock_key, lock_token):
+        for _ in range(self.LOCK_ATTEMPTS):
+            if self.cache.add(lock_key, lock_token, self.LOCK_TIMEOUT):
+                return True
+            time.sleep(self.LOCK_RETRY_DELAY)
+        return False
+
+    def _release(self, lock_key, lock_token):
+        # Блокировка могла истечь и достаться другому воркеру: снимаем только свою
+        if self.cache.get(lock_key) == lock_token:
+            self.cache.delete(lock_key)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    scope_suffix = 'ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailTokenBucketThrottle(TokenBucketThrottle):
+    scope_suffix = 'email'
+
+    def get_ident_key(self, request):
+        email = request.data.get('email')
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # В ключ кэша попадает хэш: почта приходит от клиента как есть
+        return hashlib.blake2b(email.strip().lower().encode(), digest_size=16).hexdigest()
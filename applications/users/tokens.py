@@ -0,0 +1,33 @@
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from applications.users.models.user import User
+
+# Поля пользователя, которые кладутся в токен: по ним request.user собирается без запроса в БД
+USER_CLAIMS = ('role', 'is_staff', 'is_superuser', 'is_active')
+
+
+def add_user_claims(token, user):
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+def refresh_token_for(user) -> RefreshToken:
+    # Claims refresh-токена копируются в выданные им access-токены
+    return add_user_claims(RefreshToken.for_user(user), user)
+
+
+def has_user_claims(token) -> bool:
+    return all(claim in token for claim in USER_CLAIMS)
+
+
+def user_from_claims(token) -> User:
+    """
+    Пользователь, собранный из claims access-токена. Остальные поля отложены:
+    обращение к ним (email, username, ...) загрузит их из БД.
+    """
+    claims = {'id': token[api_settings.USER_ID_CLAIM], **{claim: token[claim] for claim in USER_CLAIMS}}
+    # from_db раскладывает значения по concrete_fields модели, поэтому и порядок берется оттуда
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in claims]
+    return User.from_db(None, field_names, [claims[name] for name in field_names])
@@ -1,28 +1,21 @@
 import datetime
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from applications.users.tokens import refresh_token_for
 
-def set_jwt_cookies(response, user):
-    refresh_token = RefreshToken.for_user(user)
-    access_token = refresh_token.access_token
-
-    access_expiry = datetime.datetime.fromtimestamp(access_token['exp'], datetime.timezone.utc)
-    refresh_expiry = datetime.datetime.fromtimestamp(refresh_token['exp'], datetime.timezone.utc)
 
+def set_token_cookie(response, key, token):
     response.set_cookie(
-        key='access_token',
-        value=str(access_token),
+        key=key,
+        value=str(token),
         httponly=True,
         secure=False,
         samesite='Lax',
-        expires=access_expiry
+        expires=datetime.datetime.fromtimestamp(token['exp'], datetime.timezone.utc)
     )
 
-    response.set_cookie(
-        key='refresh_token',
-        value=str(refresh_token),
-        httponly=True,
-        secure=False,
-        samesite='Lax',
-        expires=refresh_expiry
-    )
\ No newline at end of file
+
+def set_jwt_cookies(response, user):
+    refresh_token = refresh_token_for(user)
+
+    set_token_cookie(response, 'access_token', refresh_token.access_token)
+    set_token_cookie(response, 'refresh_token', refresh_token)
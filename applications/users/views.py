@@ -5,15 +5,22 @@ from rest_framework.permissions import AllowAny, SAFE_METHODS, IsAdminUser
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from applications.permissions.permissions import IsAdminOrAllowAny
 from applications.users.models.user import User
+from applications.users.revocation import revoke
 from applications.users.serializers import RegisterUserSerializer, UserListSerializer, LoginSerializer
+from applications.users.throttling import EmailTokenBucketThrottle, IPTokenBucketThrottle
 from applications.users.utils import set_jwt_cookies
 
 
 class RegisterUserAPIView(ListCreateAPIView):
     queryset = User.objects.all()
+    # Ограничивается только регистрация (POST), список для админа — нет
+    throttle_classes = [IPTokenBucketThrottle, EmailTokenBucketThrottle]
+    throttle_scope = 'register'
 
     # permission_classes = [IsAdminOrAllowAny]
 
@@ -47,6 +54,8 @@ class RegisterUserAPIView(ListCreateAPIView):
 class LogInAPIView(APIView):
     permission_classes = [AllowAny]
     serializer_class = LoginSerializer
+    throttle_classes = [IPTokenBucketThrottle, EmailTokenBucketThrottle]
+    throttle_scope = 'login'
 
     def post(self, request: Request) -> Response:
         # username = request.data.get('username')
@@ -112,6 +121,18 @@ class LogInAPIView(APIView):
 
 class LogOutAPIView(APIView):
     def post(self, request: Request) -> Response:
+        # Refresh-токен отзывается, чтобы украденная cookie не продлевала сессию после выхода.
+        # Если middleware в этом же запросе уже ротировал токен, отзывается и новый
+        refresh_tokens = [getattr(request._request, '_new_refresh_token', None)]
+        try:
+            refresh_tokens.append(RefreshToken(request.COOKIES.get('refresh_token', '')))
+        except TokenError:
+            pass
+
+        for refresh_token in refresh_tokens:
+            if refresh_token is not None:
+                revoke(refresh_token)
+
         response = Response(
             data={"message": f"Выход выполнен"},
             status=status.HTTP_200_OK